@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Joystick to wheel latency of the teleop drive path, run headless.
+
+The robot runs on its own thread in simulation with timing paused, and is
+stepped 1 ms at a time. MagicRobot paces its loop with a Notifier and
+stepTiming waits for every notifier to be serviced, so each step returns
+with the loop that was due finished and the robot thread blocked; the
+outputs read after a step are deterministic. Each trial waits a random
+part of a loop, steps the driver's rotation axis on a simulated
+XboxController, waits until the driver station has cached it, and records
+when:
+
+    read   teleopPeriodic first reads the new axis value
+    talon  the master Talons' simulated outputs first carry the turn
+    wheel  the simulated wheels reach WHEEL_VELOCITY
+
+Teleop drives with a constant throttle, so only the difference between the
+sides is the driver's input; the wheels are simulated with that alone.
+
+Times are simulated, so they measure scheduling, not CPU speed. The
+simulated Talons apply outputs at once, a real one adds up to a control
+frame (10 ms by default) between talon and wheel that is not modeled.
+
+It is also the latency regression gate: it exits non-zero when the p95
+latency to the wheels is over --budget, or when a step never reaches them.
+tests/inputlatency_test.py runs it with the unit tests.
+
+Run from the repository root:
+python benchmarks/inputlatency.py [--trials N] [--budget SECONDS]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import hal  # noqa: E402
+import wpilib  # noqa: E402
+import wpilib.simulation  # noqa: E402
+
+import physics  # noqa: E402, F401 creates the simulated Talon devices
+import robot  # noqa: E402
+from components import chassis  # noqa: E402
+from sim import drivetrain  # noqa: E402
+from utils import constants, units  # noqa: E402
+
+STAGES = ("read", "talon", "wheel")
+
+ROTATION_AXIS = 3
+STEP = 0.9  # past the teleop deadband
+# the driver station stores axes as float32
+AXIS_TOLERANCE = 1e-6
+OUTPUT_THRESHOLD = 0.05
+WHEEL_VELOCITY = 0.05 * (units.meters / units.seconds)
+
+PHYSICS_DT = 1 * units.milliseconds
+LOOP_DT = 20 * units.milliseconds
+TIMEOUT = 0.5  # s of simulated time per trial
+SETTLE = 0.1  # s of zero input between trials
+# real time to wait on the driver station thread, simulated time is paused
+DS_TIMEOUT = 0.01
+# p95 joystick to wheel latency, two loops
+BUDGET = 40 * units.milliseconds
+
+
+class Probe:
+    """First time each stage sees the current step, in simulated seconds."""
+
+    def __init__(self):
+        self.active = False
+        self.times = {}
+
+    def arm(self, active):
+        self.active = active
+        self.times = {}
+
+    def mark(self, stage, value, threshold=OUTPUT_THRESHOLD):
+        if stage in self.times or (abs(value) > threshold) != self.active:
+            return
+        self.times[stage] = wpilib.Timer.getFPGATimestamp()
+
+
+probe = Probe()
+
+
+class ProbedController(wpilib.XboxController):
+    def getRawAxis(self, axis):
+        value = super().getRawAxis(axis)
+        if axis == ROTATION_AXIS:
+            probe.mark("read", value)
+        return value
+
+
+class ProbedRobot(robot.Robot):
+    initialized = threading.Event()
+
+    def robotInit(self):
+        super().robotInit()
+        self.initialized.set()
+
+    def createObjects(self):
+        super().createObjects()
+        self.driver = ProbedController(0)
+
+
+class Harness:
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.joystick = wpilib.simulation.XboxControllerSim(0)
+        self.outputs = ()
+        self.coefs = constants.load("drivetrain")
+        self.drive = None
+
+    def start(self):
+        wpilib.simulation.pauseTiming()
+        self.field = wpilib.Field2d()  # the pose sim devices chassis reads
+        self.robot = ProbedRobot()
+        thread = threading.Thread(
+            target=self.robot.startCompetition, name="robot", daemon=True
+        )
+        thread.start()
+        self.robot.initialized.wait()
+        # the talons only exist once the robot has created them
+        self.outputs = (
+            wpilib.simulation.SimDeviceSim("Talon FX[1]").getDouble("Motor Output"),
+            wpilib.simulation.SimDeviceSim("Talon FX[3]").getDouble("Motor Output"),
+        )
+
+        ds = wpilib.simulation.DriverStationSim
+        ds.setDsAttached(True)
+        ds.setAutonomous(False)
+        ds.setEnabled(True)
+        ds.notifyNewData()
+        self.setRotation(0)
+        self.run(0.5)
+
+    def setRotation(self, value):
+        """Move the stick, then wait until the robot would read the new value."""
+        self.joystick.setRawAxis(ROTATION_AXIS, value)
+        self.joystick.notifyNewData()
+        ds = wpilib.DriverStation.getInstance()
+        while abs(ds.getStickAxis(0, ROTATION_AXIS) - value) > AXIS_TOLERANCE:
+            ds.waitForData(DS_TIMEOUT)
+
+    def resetDrive(self):
+        coefs = self.coefs
+        self.drive = drivetrain.DrivetrainSim(
+            (coefs["ks_left"], coefs["kv_left"], coefs["ka_left"]),
+            (coefs["ks_right"], coefs["kv_right"], coefs["ka_right"]),
+            chassis.Chassis.ROBOT_MASS,
+            coefs["track_width"],
+            chassis.Chassis.WHEEL_RADIUS,
+            chassis.Chassis.GEAR_RATIO,
+        )
+
+    def step(self):
+        # returns once the robot loop due in this step has run
+        wpilib.simulation.stepTiming(PHYSICS_DT)
+        output_r, output_l = (output.get() for output in self.outputs)
+        turn = (output_l - output_r) / 2
+        probe.mark("talon", turn)
+        if self.drive is not None:
+            self.drive.update(
+                -turn,
+                turn,
+                chassis.Chassis.NOMINAL_VOLTAGE,
+                None,
+                None,
+                PHYSICS_DT,
+            )
+            probe.mark(
+                "wheel",
+                max(self.drive.left.velocity, self.drive.right.velocity, key=abs),
+                WHEEL_VELOCITY,
+            )
+
+    def run(self, seconds):
+        for _ in range(round(seconds / PHYSICS_DT)):
+            self.step()
+
+    def trial(self):
+        """Latency of each stage for one rotation step, None if it never got there."""
+        self.setRotation(0)
+        probe.arm(False)
+        self.run(SETTLE)
+        self.resetDrive()
+        # start anywhere in the robot loop
+        self.run(self.rng.randrange(round(LOOP_DT / PHYSICS_DT)) * PHYSICS_DT)
+
+        probe.arm(True)
+        start = wpilib.Timer.getFPGATimestamp()
+        self.setRotation(STEP)
+        steps = 0
+        while "wheel" not in probe.times and steps * PHYSICS_DT < TIMEOUT:
+            self.step()
+            steps += 1
+        return {stage: probe.times.get(stage, None) for stage in STAGES}, start
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def report(trials):
+    print(
+        f"{'stage':>8} {'min':>7} {'median':>7} {'p95':>7} {'max':>7}"
+        f"   {'from previous stage, median':>27}"
+    )
+    prev = None
+    for stage in STAGES:
+        latencies = [times[stage] - start for times, start in trials]
+        if prev is None:
+            increments = latencies
+        else:
+            increments = [times[stage] - times[prev] for times, _ in trials]
+        ms = units.to_milliseconds
+        print(
+            f"{stage:>8} {min(latencies) * ms:>5.1f}ms"
+            f" {statistics.median(latencies) * ms:>5.1f}ms"
+            f" {percentile(latencies, 0.95) * ms:>5.1f}ms"
+            f" {max(latencies) * ms:>5.1f}ms"
+            f"   {statistics.median(increments) * ms:>25.1f}ms"
+        )
+        prev = stage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--budget", type=float, default=BUDGET, help="p95 wheel latency, seconds"
+    )
+    args = parser.parse_args()
+
+    hal.initialize(500, 0)
+    harness = Harness(args.seed)
+    harness.start()
+
+    trials = []
+    missed = 0
+    for _ in range(args.trials):
+        times, start = harness.trial()
+        if any(value is None for value in times.values()):
+            missed += 1
+        else:
+            trials.append((times, start))
+
+    print(f"{len(trials)} rotation steps, {missed} never reached the wheels")
+    if not trials:
+        return 1
+    report(trials)
+
+    wheel = percentile([times["wheel"] - start for times, start in trials], 0.95)
+    ms = units.to_milliseconds
+    if missed or wheel > args.budget:
+        print(f"FAIL: p95 {wheel * ms:.1f}ms, budget {args.budget * ms:.1f}ms")
+        return 1
+    print(f"ok: p95 {wheel * ms:.1f}ms, budget {args.budget * ms:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
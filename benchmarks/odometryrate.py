@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Compare the odometry thread against once-per-loop odometry.
+
+A robot doing aggressive slaloms is simulated at high rate to get a ground
+truth pose. The loop path feeds encoder and gyro samples at 50 Hz to
+DifferentialDriveOdometry, restated here as its Pose2d.exp step since it
+needs the robot libraries. The worker feeds samples at 200 Hz to
+ArcOdometry. Both steps are the same constant curvature arc, so the
+difference is the sample rate alone. The slaloms are periodic and part of
+the error cancels out over each one, so the max and RMS error are reported
+rather than where the run happens to end. Throughput of the worker is
+measured by running it on its thread against a synthetic sensor.
+
+Run from the repository root: python benchmarks/odometryrate.py
+"""
+
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from controls import arcodometry  # noqa: E402
+from utils import odometryworker  # noqa: E402
+
+TRACK_WIDTH = 0.6096
+DURATION = 20
+TRUTH_RATE = 10000
+JITTER = 0.5e-3  # sample timestamp jitter, seconds
+
+
+def groundTruth():
+    """Wheel positions, heading and pose of a robot doing slaloms."""
+    t = np.arange(0, DURATION, 1 / TRUTH_RATE)
+    velocity = 2.5 + 1.0 * np.sin(2 * np.pi * 0.3 * t)
+    omega = 5.0 * np.sin(2 * np.pi * 0.8 * t)
+    dt = 1 / TRUTH_RATE
+    left = np.cumsum(velocity - omega * TRACK_WIDTH / 2) * dt
+    right = np.cumsum(velocity + omega * TRACK_WIDTH / 2) * dt
+    heading = np.cumsum(omega) * dt
+    x = np.cumsum(velocity * np.cos(heading)) * dt
+    y = np.cumsum(velocity * np.sin(heading)) * dt
+    return t, left, right, heading, x, y
+
+
+class LoopOdometry:
+    """DifferentialDriveOdometry.update: Pose2d.exp of the step's twist."""
+
+    def __init__(self, x, y, heading, left, right):
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.prev_left = left
+        self.prev_right = right
+
+    def update(self, left, right, gyro):
+        dx = ((left - self.prev_left) + (right - self.prev_right)) / 2
+        dtheta = gyro - self.heading
+        self.prev_left = left
+        self.prev_right = right
+        if abs(dtheta) < 1e-9:
+            s = 1 - dtheta ** 2 / 6
+            c = dtheta / 2
+        else:
+            s = math.sin(dtheta) / dtheta
+            c = (1 - math.cos(dtheta)) / dtheta
+        # robot-relative move, rotated into the field
+        move_x = dx * s
+        move_y = dx * c
+        cos = math.cos(self.heading)
+        sin = math.sin(self.heading)
+        self.x += move_x * cos - move_y * sin
+        self.y += move_x * sin + move_y * cos
+        self.heading = gyro
+
+
+def integrate(truth, rate, worker=True, seed=0):
+    t, left, right, heading, x, y = truth
+    rng = np.random.default_rng(seed)
+    times = np.arange(0, DURATION, 1 / rate) + rng.uniform(
+        -JITTER, JITTER, int(DURATION * rate)
+    )
+    idx = np.clip((times * TRUTH_RATE).astype(int), 0, len(t) - 1)
+    i = idx[0]
+    if worker:
+        odometry = arcodometry.ArcOdometry()
+        odometry.reset(x[i], y[i], heading[i], left[i], right[i], heading[i])
+    else:
+        odometry = LoopOdometry(x[i], y[i], heading[i], left[i], right[i])
+    errors = []
+    for i in idx[1:]:
+        odometry.update(left[i], right[i], heading[i])
+        errors.append(math.hypot(odometry.x - x[i], odometry.y - y[i]))
+    errors = np.array(errors)
+    return errors.max(), math.sqrt(np.mean(errors ** 2))
+
+
+def throughput(seconds=2.0):
+    start = time.monotonic()
+
+    def sample():
+        now = time.monotonic() - start
+        return now, now * 2, now * 2.1, now * 0.3, None
+
+    worker = odometryworker.OdometryWorker(sample)
+    worker.start()
+    time.sleep(seconds)
+    worker.stop()
+    rate = worker.samples / seconds
+
+    odometry = arcodometry.ArcOdometry()
+    n = 100000
+    begin = time.perf_counter()
+    for i in range(n):
+        odometry.update(i * 1e-3, i * 1.1e-3, i * 1e-4)
+    per_update = (time.perf_counter() - begin) / n
+    return rate, worker.overruns, per_update
+
+
+def main():
+    truth = groundTruth()
+    print(f"{'path':>12} {'rate':>6} {'max err':>10} {'rms err':>10}")
+    for name, worker, rate in (("loop", False, 50), ("worker", True, 200)):
+        worst, rms = integrate(truth, rate, worker)
+        print(f"{name:>12} {rate:>4}Hz {worst * 100:>8.2f}cm {rms * 100:>8.2f}cm")
+
+    rate, overruns, per_update = throughput()
+    print(
+        f"worker: {rate:.0f} samples/s, {overruns} overruns, {per_update * 1e6:.2f} us per update"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Full throttle launches with and without traction control.
+
+The drivetrain is simulated as in physics.py, with tread friction, at high
+rate. Chassis runs at the 50 Hz loop rate: wheel motion comes from
+differenced encoder positions as in MotorState, chassis motion from a noisy
+IMU. Reports the time to cover DISTANCE and how far the 200 Hz odometry is
+off at that point, trusting the encoders blindly and down-weighting samples
+flagged as slipping. Each case runs with SEEDS different IMU noise draws,
+times are the mean and the worst, errors the mean magnitude.
+
+Run from the repository root: python benchmarks/traction.py
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from controls import arcodometry, motorstate, tractioncontrol  # noqa: E402
+from sim import drivetrain  # noqa: E402
+from utils import constants, odometryworker, robotconstants  # noqa: E402
+
+Chassis = robotconstants.ChassisConstants
+FRICTION = robotconstants.SimConstants.FRICTION_COEFFICIENT
+
+DISTANCE = 5  # m
+PHYSICS_DT = 0.001
+LOOP_DT = 0.02
+ODOMETRY_DT = 0.005
+IMU_NOISE = 0.3  # m/s^2
+SEEDS = 16
+
+
+def run(traction_control, friction=FRICTION, seed=0):
+    coefs = constants.load("drivetrain")
+    drive = drivetrain.DrivetrainSim(
+        (coefs["ks_left"], coefs["kv_left"], coefs["ka_left"]),
+        (coefs["ks_right"], coefs["kv_right"], coefs["ka_right"]),
+        Chassis.ROBOT_MASS,
+        coefs["track_width"],
+        Chassis.WHEEL_RADIUS,
+        Chassis.GEAR_RATIO,
+        friction=friction,
+    )
+    traction = tractioncontrol.TractionControl(
+        coefs["track_width"],
+        (coefs["ks_left"] + coefs["ks_right"]) / 2,
+        (coefs["kv_left"] + coefs["kv_right"]) / 2,
+        (coefs["ka_left"] + coefs["ka_right"]) / 2,
+    )
+    wheel_left = motorstate.MotorState()
+    wheel_right = motorstate.MotorState()
+    raw = arcodometry.ArcOdometry()
+    weighted = arcodometry.ArcOdometry()
+    rng = random.Random(seed)
+
+    loop_every = round(LOOP_DT / PHYSICS_DT)
+    odometry_every = round(ODOMETRY_DT / PHYSICS_DT)
+    output_l = output_r = 0
+    distance = 0
+    step = 0
+    while distance < DISTANCE:
+        if step % loop_every == 0:
+            wheel_left.update(drive.left.position, LOOP_DT)
+            wheel_right.update(drive.right.position, LOOP_DT)
+            imu = (
+                drive.left.ground_acceleration + drive.right.ground_acceleration
+            ) / 2 + rng.gauss(0, IMU_NOISE)
+            traction.update(
+                wheel_left.velocity,
+                wheel_right.velocity,
+                wheel_left.acceleration,
+                wheel_right.acceleration,
+                imu,
+                0,
+                LOOP_DT,
+            )
+            output_l = output_r = 1
+            if traction_control:
+                output_l = traction.limitOutput(traction.left, output_l)
+                output_r = traction.limitOutput(traction.right, output_r)
+        if step % odometry_every == 0:
+            left = drive.left.position
+            right = drive.right.position
+            raw.update(left, right, 0)
+            if traction.isSlipping():
+                weighted.update(
+                    left,
+                    right,
+                    0,
+                    odometryworker.OdometryWorker.SLIP_WEIGHT,
+                    traction.getVelocity() * ODOMETRY_DT,
+                )
+            else:
+                weighted.update(left, right, 0)
+        dx, _, _ = drive.update(
+            output_l, output_r, Chassis.NOMINAL_VOLTAGE, None, None, PHYSICS_DT
+        )
+        distance += dx
+        step += 1
+
+    slip_loops = traction.left.slip_samples + traction.right.slip_samples
+    return step * PHYSICS_DT, raw.x - distance, weighted.x - distance, slip_loops
+
+
+def main():
+    print(f"full throttle for {DISTANCE} m, tread friction {FRICTION}")
+    print(
+        f"{'':>18} {'time':>7} {'worst':>7} {'raw odom err':>13} {'weighted err':>13}"
+        f" {'slip loops':>10}"
+    )
+    for name, traction_control, friction in (
+        ("no slip", False, None),
+        ("uncontrolled", False, FRICTION),
+        ("traction control", True, FRICTION),
+    ):
+        results = [run(traction_control, friction, seed) for seed in range(SEEDS)]
+        times, raw, weighted, slip_loops = zip(*results)
+        print(
+            f"{name:>18} {sum(times) / SEEDS:>6.3f}s {max(times):>6.3f}s"
+            f" {mean(raw) * 100:>11.1f}cm {mean(weighted) * 100:>11.1f}cm"
+            f" {sum(slip_loops) / SEEDS:>10.1f}"
+        )
+
+
+def mean(errors):
+    """Mean magnitude of the errors."""
+    return math.fsum(abs(error) for error in errors) / len(errors)
+
+
+if __name__ == "__main__":
+    main()
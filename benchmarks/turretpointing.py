@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Turret pointing error while the chassis runs an aggressive TurnToAngle.
+
+The chassis is simulated as in physics.py and turned 180 degrees by the
+ProfiledTurn TurnToAngle runs, with the characterized constants, so the yaw
+the turret sees includes the drivetrain's lag and tracking error. The turret
+is simulated as in physics.py and controlled at the 50 Hz loop rate, holding
+a robot-relative heading (the old setHeading), a field-relative heading on
+feedback only, and a field-relative heading with chassis yaw rate
+feedforward.
+
+Run from the repository root: python benchmarks/turretpointing.py
+"""
+
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from controls import headinghold, pidf, profiledturn  # noqa: E402
+from sim import drivetrain  # noqa: E402
+from utils import constants, robotconstants, units  # noqa: E402
+
+Chassis = robotconstants.ChassisConstants
+Turret = robotconstants.TurretConstants
+TurnToAngle = robotconstants.TurnToAngleConstants
+Sim = robotconstants.SimConstants
+
+PHYSICS_DT = 0.001
+LOOP_DT = 0.02
+TURN = math.pi
+SETTLE = 0.5
+
+
+def makeTurn():
+    coefs = constants.load("drivetrain")
+    ks = (coefs["ks_left"] + coefs["ks_right"]) / 2
+    kv = (coefs["kv_left"] + coefs["kv_right"]) / 2
+    ka = (coefs["ka_left"] + coefs["ka_right"]) / 2
+    drive = drivetrain.DrivetrainSim(
+        (ks, kv, ka),
+        (ks, kv, ka),
+        Chassis.ROBOT_MASS,
+        coefs["track_width"],
+        Chassis.WHEEL_RADIUS,
+        Chassis.GEAR_RATIO,
+    )
+    turn = profiledturn.ProfiledTurn(
+        ks,
+        kv,
+        ka,
+        coefs["track_width"] / 2,
+        TurnToAngle.PROFILE_VOLTAGE,
+        TurnToAngle.CRUISE_FRACTION,
+        TurnToAngle.PROFILE_KP,
+    )
+    return drive, turn
+
+
+def run(mode, target=0.5):
+    drive, turn = makeTurn()
+    duration = turn.plan(0, TURN)
+    hold = headinghold.HeadingHold(Turret.KP, 0, 0, Turret.MAX_VELOCITY)
+    relative = pidf.PIDF(Turret.KP, 0, 0, 0)
+    relative.setOutputRange(-1, 1)
+    # start on target
+    angle = target
+    relative.setSetpoint(angle)
+
+    heading = 0
+    rate = 0
+    velocity = 0
+    output = 0
+    drive_output = 0
+    errors = []
+    steps = int((duration + SETTLE) / PHYSICS_DT)
+    loop_every = int(LOOP_DT / PHYSICS_DT)
+    for step in range(steps):
+        if step % loop_every == 0:
+            t = step * PHYSICS_DT
+            # TurnToAngle.followProfile, then stopped once the profile is done
+            if turn.isFinished(t):
+                drive_output = 0
+            else:
+                volts = turn.update(t, heading, LOOP_DT)
+                drive_output = volts / Chassis.NOMINAL_VOLTAGE
+            if mode == "robot relative":
+                output = relative.update(angle, LOOP_DT)
+            else:
+                output = hold.update(
+                    target, heading, rate, angle, LOOP_DT, mode == "feedforward"
+                )
+        # physics.py drives its left side with the right talon
+        _, _, dtheta = drive.update(
+            -drive_output, drive_output, Chassis.NOMINAL_VOLTAGE, dt=PHYSICS_DT
+        )
+        heading += dtheta
+        rate = dtheta / PHYSICS_DT
+        velocity += (
+            (output * Turret.MAX_VELOCITY - velocity)
+            * PHYSICS_DT
+            / Sim.TURRET_TIME_CONSTANT
+        )
+        angle += velocity * PHYSICS_DT
+        errors.append(units.angle_range(target - (heading + angle)))
+
+    worst = max(abs(error) for error in errors)
+    rms = math.sqrt(sum(error ** 2 for error in errors) / len(errors))
+    return worst, rms, abs(errors[-1]), abs(TURN - heading)
+
+
+def main():
+    _, turn = makeTurn()
+    duration = turn.plan(0, TURN)
+    print(
+        f"turn: {math.degrees(TURN):.0f} deg in {duration:.2f} s,"
+        f" peak {turn.profile.cruise_velocity:.1f} rad/s"
+    )
+    print(
+        f"{'mode':>15} {'max err':>9} {'rms err':>9} {'final err':>9}"
+        f" {'turn err':>9}"
+    )
+    for mode in ("robot relative", "feedback", "feedforward"):
+        worst, rms, final, turn_error = run(mode)
+        print(
+            f"{mode:>15} {math.degrees(worst):>7.1f}deg {math.degrees(rms):>7.1f}deg"
+            f" {math.degrees(final):>7.1f}deg {math.degrees(turn_error):>7.1f}deg"
+        )
+
+
+if __name__ == "__main__":
+    main()
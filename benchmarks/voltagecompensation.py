@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Velocity tracking on a sagging battery with and without voltage compensation.
+
+The drivetrain and battery are simulated as in physics.py, at high rate, and
+drive back and forth along trapezoid profiles, starting from a full, a half
+and an empty battery while the rest of the robot draws OTHER_CURRENT.
+Chassis runs at the 50 Hz loop rate the way it does in simulation: the
+velocity setpoint is the profile's plus a correction for the position
+error, as ReplayPath's controller adds, and the motors run on feedforward
+alone. The feedforward is scaled by
+
+    12 V        a fixed 12 V (the old Chassis)
+    measured    the filtered battery voltage sampled at the start of the loop
+    talon       talon voltage compensation to 12 V
+
+with the acceleration differenced from the velocity setpoints (the old
+MotorFeedforward) or planned by the profile. PowerManager's battery model
+sets the drive supply limits every loop, as on the robot; it only knows about
+the motors it manages, not OTHER_CURRENT.
+
+The measured position carries POSITION_NOISE, as a pose estimate would.
+Reports the RMS velocity and position error against the profile, the RMS
+change in output from one loop to the next, the lowest battery voltage and
+its margin over the roboRIO brownout voltage, negative when it browned out.
+
+Run from the repository root: python benchmarks/voltagecompensation.py
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from controls import motorfeedforward, powerbudget, trapezoidprofile  # noqa: E402
+from sim import battery, drivetrain  # noqa: E402
+from utils import constants, robotconstants  # noqa: E402
+
+Chassis = robotconstants.ChassisConstants
+Power = robotconstants.PowerConstants
+# BatteryMonitor's, that module needs the robot libraries
+FILTER_TIME_CONSTANT = 0.04
+
+PHYSICS_DT = 0.001
+LOOP_DT = 0.02
+DISTANCE = 4  # m per lap
+MAX_VELOCITY = 3  # m/s
+MAX_ACCELERATION = 6  # m/s^2
+POSITION_KP = 2  # m/s of correction per m of error
+LAPS = 10
+VOLTAGE_NOISE = 0.05  # V, on each battery sample
+POSITION_NOISE = 0.01  # m, on each pose sample
+# shooter, intake and whatever else runs while driving
+OTHER_CURRENT = 40  # A
+BATTERY_VOLTAGES = (
+    battery.BatterySim.FULL_VOLTAGE,
+    12.2,
+    battery.BatterySim.EMPTY_VOLTAGE,
+)
+
+# (voltage, planned acceleration)
+MODES = (
+    ("12 V", False),
+    ("12 V", True),
+    ("measured", False),
+    ("measured", True),
+    ("talon", False),
+    ("talon", True),
+)
+
+
+def run(compensation, planned, battery_voltage, seed=0):
+    coefs = constants.load("drivetrain")
+    ks = (coefs["ks_left"] + coefs["ks_right"]) / 2
+    kv = (coefs["kv_left"] + coefs["kv_right"]) / 2
+    ka = (coefs["ka_left"] + coefs["ka_right"]) / 2
+    drive = drivetrain.DrivetrainSim(
+        (ks, kv, ka),
+        (ks, kv, ka),
+        Chassis.ROBOT_MASS,
+        coefs["track_width"],
+        Chassis.WHEEL_RADIUS,
+        Chassis.GEAR_RATIO,
+    )
+    cell = battery.BatterySim(battery_voltage)
+    feedforward = motorfeedforward.MotorFeedforward(ks, kv, ka)
+    profile = trapezoidprofile.TrapezoidProfile(MAX_VELOCITY, MAX_ACCELERATION)
+    rng = random.Random(seed)
+    gain = LOOP_DT / (FILTER_TIME_CONSTANT + LOOP_DT)
+    # PowerManager's consumers, the turret sits still
+    chassis = powerbudget.Consumer(
+        "chassis",
+        ("dm_l", "dm_r", "ds_l", "ds_r"),
+        0,
+        Power.CHASSIS_MIN_CURRENT,
+        Power.CHASSIS_MAX_CURRENT,
+    )
+    turret = powerbudget.Consumer(
+        "turret", ("turret",), 1, Power.TURRET_MIN_CURRENT, Power.TURRET_MAX_CURRENT
+    )
+    model = powerbudget.BatteryModel(Power.MODEL_VOLTAGE, Power.MODEL_RESISTANCE)
+
+    loop_every = round(LOOP_DT / PHYSICS_DT)
+    voltage = cell.update(Power.BASE_CURRENT + OTHER_CURRENT, PHYSICS_DT)
+    filtered = min_voltage = voltage
+    velocity_sq = position_sq = jitter_sq = 0
+    samples = 0
+    output = 0
+    for lap in range(LAPS):
+        start = drive.left.position
+        goal = 0 if lap % 2 else DISTANCE
+        duration = profile.plan(start, goal)
+        step = 0
+        while step * PHYSICS_DT < duration + LOOP_DT:
+            if step % loop_every == 0:
+                t = step * PHYSICS_DT
+                reference, velocity, acceleration = profile.sample(t)
+                position = drive.left.position
+                measured = position + rng.gauss(0, POSITION_NOISE)
+                command = velocity + POSITION_KP * (reference - measured)
+                sample = voltage + rng.gauss(0, VOLTAGE_NOISE)
+                filtered += gain * (sample - filtered)
+                model.update(sample, drive.getSupplyCurrent() + Power.BASE_CURRENT)
+                budget = model.getBudget(Power.MIN_VOLTAGE) - Power.BASE_CURRENT
+                for consumer, limit in powerbudget.allocate((chassis, turret), budget):
+                    consumer.limit = limit
+                if planned:
+                    volts = feedforward.calculate(command, LOOP_DT, acceleration)
+                else:
+                    volts = feedforward.calculate(command, LOOP_DT)
+                prev_output = output
+                if compensation == "measured":
+                    output = volts / filtered
+                else:
+                    output = volts / Chassis.NOMINAL_VOLTAGE
+                output = max(-1, min(output, 1))
+                jitter_sq += (output - prev_output) ** 2
+                velocity_sq += (drive.left.velocity - velocity) ** 2
+                position_sq += (position - reference) ** 2
+                samples += 1
+            applied = output
+            if compensation == "talon":
+                applied = max(-1, min(output * Chassis.NOMINAL_VOLTAGE / voltage, 1))
+            drive.update(
+                applied, applied, voltage, chassis.limit, chassis.limit, PHYSICS_DT
+            )
+            current = drive.getSupplyCurrent() + Power.BASE_CURRENT + OTHER_CURRENT
+            voltage = cell.update(current, PHYSICS_DT)
+            min_voltage = min(min_voltage, voltage)
+            step += 1
+    return (
+        math.sqrt(velocity_sq / samples),
+        math.sqrt(position_sq / samples),
+        math.sqrt(jitter_sq / samples),
+        min_voltage,
+    )
+
+
+def main():
+    print(
+        f"{LAPS} laps of {DISTANCE} m at {MAX_ACCELERATION} m/s^2,"
+        f" {OTHER_CURRENT} A drawn elsewhere"
+    )
+    print(
+        f"{'open circuit':>22}"
+        + "".join(f" {voltage:>38.1f}V" for voltage in BATTERY_VOLTAGES)
+    )
+    print(
+        f"{'':>22}"
+        + f" {'velocity':>10} {'position':>8} {'jitter':>6} {'min':>5} {'margin':>6}"
+        * len(BATTERY_VOLTAGES)
+    )
+    results = {mode: [run(*mode, v) for v in BATTERY_VOLTAGES] for mode in MODES}
+    for mode in MODES:
+        compensation, planned = mode
+        name = f"{compensation}, {'planned' if planned else 'differenced'}"
+        print(
+            f"{name:>22}"
+            + "".join(
+                f" {velocity * 100:>6.1f}cm/s {position * 100:>6.1f}cm"
+                f" {jitter * 100:>5.1f}% {min_voltage:>4.1f}V"
+                f" {min_voltage - Power.BROWNOUT_VOLTAGE:>+5.1f}V"
+                for velocity, position, jitter, min_voltage in results[mode]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Frame rate of the vision pipeline with and without ROI tracking.
+
+Sample frames are synthesized: a noisy dark scene with a green target that
+drifts across the image, plus a few unrelated bright spots. Pass --frames to
+benchmark recorded frames instead.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import pipeline
+
+
+def sampleFrames(count=300, width=320, height=240, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, 60, (count, height, width, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        x = int(60 + 200 * i / count)
+        y = int(80 + 20 * np.sin(i / 20))
+        frame[y : y + 14, x : x + 40] = (40, 230, 120)
+        frame[y + 4 : y + 10, x + 6 : x + 34] = 20  # hollow target
+        # distractors that are bright but not green
+        frame[200:210, 20:30] = (250, 250, 250)
+        frame[30:40, 280:290] = (230, 60, 40)
+    return frames
+
+
+def run(frames, track):
+    vision = pipeline.VisionPipeline(frames.shape[2], frames.shape[1])
+    latencies = []
+    found = 0
+    for frame in frames:
+        if not track:
+            vision.roi = None
+        start = time.perf_counter()
+        target = vision.process(frame)
+        latencies.append(time.perf_counter() - start)
+        found += target.found
+    return latencies, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames")
+    args = parser.parse_args()
+    frames = np.load(args.frames) if args.frames else sampleFrames()
+
+    for track in (False, True):
+        latencies, found = run(frames, track)
+        name = "roi" if track else "full frame"
+        print(
+            f"{name:>10}: {len(latencies) / sum(latencies):7.1f} fps,"
+            f" median {statistics.median(latencies) * 1000:.2f} ms,"
+            f" max {max(latencies) * 1000:.2f} ms,"
+            f" found {found}/{len(frames)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
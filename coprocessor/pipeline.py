@@ -0,0 +1,194 @@
+"""Retroreflective target pipeline for the vision coprocessor.
+
+Frames are thresholded in HSV with vectorized numpy. Once a target is found,
+only a window around it is searched on the next frame, falling back to the
+full frame when the target is lost.
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+class Target:
+    __slots__ = (
+        "found",
+        "x",
+        "y",
+        "left",
+        "top",
+        "width",
+        "height",
+        "distance",
+        "heading",
+    )
+
+    def __init__(self):
+        self.found = False
+        # centroid and bounding box, in pixels
+        self.x = 0
+        self.y = 0
+        self.left = 0
+        self.top = 0
+        self.width = 0
+        self.height = 0
+        self.distance = 0
+        self.heading = 0
+
+
+def hsvMask(rgb, h_min, h_max, s_min, v_min):
+    """Threshold an (h, w, 3) uint8 RGB image in HSV, hue in degrees."""
+    rgb = rgb.astype(np.int32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    max_c = np.maximum(np.maximum(r, g), b)
+    min_c = np.minimum(np.minimum(r, g), b)
+    delta = max_c - min_c
+
+    # value and saturation first, they reject most pixels cheaply
+    mask = (max_c >= v_min) & (delta * 255 >= s_min * max_c) & (delta > 0)
+
+    safe = np.where(delta == 0, 1, delta)
+    hue = np.where(
+        max_c == r,
+        60 * (g - b) / safe,
+        np.where(max_c == g, 60 * (b - r) / safe + 120, 60 * (r - g) / safe + 240),
+    )
+    hue = np.where(hue < 0, hue + 360, hue)
+    return mask & (hue >= h_min) & (hue <= h_max)
+
+
+def largestRun(counts, min_count):
+    """Start and end (exclusive) of the longest run of counts >= min_count."""
+    active = np.concatenate(([0], (counts >= min_count).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(active))
+    if len(edges) == 0:
+        return None
+    starts, ends = edges[0::2], edges[1::2]
+    longest = np.argmax(ends - starts)
+    return starts[longest], ends[longest]
+
+
+class VisionPipeline:
+    # hsv threshold for a green led ring, hue in degrees
+    H_MIN = 100
+    H_MAX = 160
+    S_MIN = 120
+    V_MIN = 100
+
+    MIN_PIXELS = 2  # per row or column of the target
+    MIN_AREA = 30
+
+    # search window around the last target, in target sizes
+    ROI_MARGIN = 1.0
+
+    # camera
+    HORIZONTAL_FOV = math.radians(62.8)
+    CAMERA_HEIGHT = 0.6  # m
+    CAMERA_PITCH = math.radians(25)
+    TARGET_HEIGHT = 2.49  # m, center of the power port target
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.focal_length = width / 2 / math.tan(self.HORIZONTAL_FOV / 2)
+
+        self.target = Target()
+        self.roi = None
+        self.roi_frames = 0
+        self.full_frames = 0
+
+    def _search(self, frame, x0, y0):
+        mask = hsvMask(frame, self.H_MIN, self.H_MAX, self.S_MIN, self.V_MIN)
+        columns = largestRun(mask.sum(axis=0), self.MIN_PIXELS)
+        if columns is None:
+            return False
+        mask = mask[:, columns[0] : columns[1]]
+        rows = largestRun(mask.sum(axis=1), self.MIN_PIXELS)
+        if rows is None:
+            return False
+        mask = mask[rows[0] : rows[1]]
+        area = np.count_nonzero(mask)
+        if area < self.MIN_AREA:
+            return False
+
+        ys, xs = np.nonzero(mask)
+        target = self.target
+        target.x = x0 + columns[0] + xs.mean()
+        target.y = y0 + rows[0] + ys.mean()
+        target.left = x0 + columns[0]
+        target.top = y0 + rows[0]
+        target.width = columns[1] - columns[0]
+        target.height = rows[1] - rows[0]
+        return True
+
+    def _touchesRoi(self):
+        x0, y0, x1, y1 = self.roi
+        target = self.target
+        return (
+            (x0 > 0 and target.left <= x0)
+            or (y0 > 0 and target.top <= y0)
+            or (x1 < self.width and target.left + target.width >= x1)
+            or (y1 < self.height and target.top + target.height >= y1)
+        )
+
+    def _solve(self):
+        target = self.target
+        target.heading = math.atan((target.x - self.width / 2) / self.focal_length)
+        pitch = self.CAMERA_PITCH + math.atan(
+            (self.height / 2 - target.y) / self.focal_length
+        )
+        target.distance = (self.TARGET_HEIGHT - self.CAMERA_HEIGHT) / math.tan(pitch)
+
+    def process(self, frame):
+        """Find the target in an (h, w, 3) RGB frame."""
+        found = False
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            found = self._search(frame[y0:y1, x0:x1], x0, y0)
+            self.roi_frames += 1
+            if found and self._touchesRoi():
+                # the target moved past the window and may be clipped
+                found = False
+        if not found:
+            found = self._search(frame, 0, 0)
+            self.full_frames += 1
+
+        target = self.target
+        target.found = found
+        if found:
+            self._solve()
+            margin_x = int(target.width * (0.5 + self.ROI_MARGIN))
+            margin_y = int(target.height * (0.5 + self.ROI_MARGIN))
+            self.roi = (
+                max(int(target.x) - margin_x, 0),
+                max(int(target.y) - margin_y, 0),
+                min(int(target.x) + margin_x, self.width),
+                min(int(target.y) + margin_y, self.height),
+            )
+        else:
+            self.roi = None
+        return target
+
+
+class Publisher:
+    """Publish targets to the NT table the robot's Vision component reads."""
+
+    TABLE = "/vision"
+
+    def __init__(self, server):
+        from networktables import NetworkTables
+
+        NetworkTables.initialize(server=server)
+        self.nt = NetworkTables.getTable(self.TABLE)
+        self.frames = 0
+
+    def publish(self, target, capture_time):
+        latency = time.monotonic() - capture_time
+        self.frames += 1
+        self.nt.putNumber("frame", self.frames)
+        self.nt.putBoolean("has_target", target.found)
+        self.nt.putNumber("distance", target.distance)
+        self.nt.putNumber("heading", target.heading)
+        self.nt.putNumber("latency", latency)
+        return latency
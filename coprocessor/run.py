@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Run the vision pipeline on a camera or on recorded frames.
+
+Recorded frames are an (n, h, w, 3) uint8 RGB array saved with numpy.save.
+Reading a camera needs OpenCV on the coprocessor.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import pipeline
+
+
+def cameraFrames(device):
+    import cv2
+
+    capture = cv2.VideoCapture(device)
+    while True:
+        ok, frame = capture.read()
+        capture_time = time.monotonic()
+        if not ok:
+            return
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), capture_time
+
+
+def recordedFrames(path):
+    for frame in np.load(path, mmap_mode="r"):
+        yield np.asarray(frame), time.monotonic()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", default="10.29.84.2")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--camera", type=int)
+    source.add_argument("--frames")
+    args = parser.parse_args()
+
+    frames = (
+        cameraFrames(args.camera)
+        if args.camera is not None
+        else recordedFrames(args.frames)
+    )
+    publisher = pipeline.Publisher(args.server)
+    vision = None
+    for frame, capture_time in frames:
+        if vision is None:
+            vision = pipeline.VisionPipeline(frame.shape[1], frame.shape[0])
+        target = vision.process(frame)
+        publisher.publish(target, capture_time)
+
+
+if __name__ == "__main__":
+    main()
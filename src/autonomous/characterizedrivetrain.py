@@ -0,0 +1,150 @@
+import logging
+import math
+
+import wpilib
+from magicbot import AutonomousStateMachine, state
+from networktables import NetworkTables
+
+from components import chassis
+from controls import characterization
+from utils import constants, samplelog, units
+
+
+class CharacterizeDrivetrain(AutonomousStateMachine):
+    """Fit the drivetrain feedforward and track width from voltage ramps.
+
+    Runs quasistatic ramps and dynamic steps in both directions, then turns in
+    place, logging every loop. The fitted constants are written to
+    constants/drivetrain.json, which Chassis and the simulator load on boot.
+    """
+
+    MODE_NAME = "Characterize Drivetrain"
+    DEFAULT = False
+
+    chassis: chassis.Chassis
+
+    QUASISTATIC_RAMP = 0.5 * (units.volts / units.seconds)
+    QUASISTATIC_TIME = 12 * units.seconds
+    DYNAMIC_VOLTAGE = 6 * units.volts
+    DYNAMIC_TIME = 2 * units.seconds
+    TURN_VOLTAGE = 4 * units.volts
+    TURN_TIME = 3 * units.seconds
+    REST_TIME = 2 * units.seconds
+
+    # (name, direction), turning must stay last, it is fitted separately
+    TESTS = (
+        ("quasistatic", 1),
+        ("quasistatic", -1),
+        ("dynamic", 1),
+        ("dynamic", -1),
+        ("turn", 1),
+    )
+
+    def __init__(self):
+        self.log = samplelog.SampleLog(characterization.FIELDS)
+        self.test = 0
+        self.output_left = 0
+        self.output_right = 0
+
+    def setup(self):
+        self.nt = NetworkTables.getTable("/components/characterization")
+
+    def on_enable(self):
+        self.test = 0
+        self.log.clear()
+        # the logged voltage must be what the motors got
+        self.chassis.setTractionControl(False)
+        super().on_enable()
+
+    def _record(self):
+        """Log this loop's measurements against the output applied last loop."""
+        voltage = self.chassis.getOutputVoltage()
+        self.log.append(
+            wpilib.Timer.getFPGATimestamp(),
+            self.test,
+            self.output_left * voltage,
+            self.output_right * voltage,
+            self.chassis.wheel_left.position,
+            self.chassis.wheel_right.position,
+            self.chassis.getHeading(),
+        )
+
+    def _setVoltage(self, left, right):
+        self.output_left = self.chassis.voltsToOutput(left)
+        self.output_right = self.chassis.voltsToOutput(right)
+        self.chassis.setOutput(self.output_left, self.output_right)
+
+    @state(first=True)
+    def runTest(self, initial_call, state_tm):
+        if not initial_call:
+            self._record()
+
+        kind, direction = self.TESTS[self.test]
+        if kind == "quasistatic":
+            voltage = direction * self.QUASISTATIC_RAMP * state_tm
+            self._setVoltage(voltage, voltage)
+            duration = self.QUASISTATIC_TIME
+        elif kind == "dynamic":
+            voltage = direction * self.DYNAMIC_VOLTAGE
+            self._setVoltage(voltage, voltage)
+            duration = self.DYNAMIC_TIME
+        else:
+            self._setVoltage(
+                direction * self.TURN_VOLTAGE, -direction * self.TURN_VOLTAGE
+            )
+            duration = self.TURN_TIME
+
+        if state_tm >= duration:
+            self.next_state("rest")
+
+    @state()
+    def rest(self, state_tm):
+        self._setVoltage(0, 0)
+        if state_tm >= self.REST_TIME:
+            self.test += 1
+            if self.test < len(self.TESTS):
+                self.next_state("runTest")
+            else:
+                self.next_state("fit")
+
+    @state()
+    def fit(self):
+        self.chassis.stop()
+        log = self.log
+        turn = log["test"] == len(self.TESTS) - 1
+        straight = ~turn
+
+        values = {}
+        for side in ("left", "right"):
+            ks, kv, ka = characterization.fitFeedforward(
+                log["time"][straight],
+                log["test"][straight],
+                log[f"voltage_{side}"][straight],
+                log[f"position_{side}"][straight],
+            )
+            values[f"ks_{side}"] = float(ks)
+            values[f"kv_{side}"] = float(kv)
+            values[f"ka_{side}"] = float(ka)
+        values["track_width"] = float(
+            characterization.fitTrackWidth(
+                log["position_left"][turn],
+                log["position_right"][turn],
+                log["heading"][turn],
+            )
+        )
+        # e.g. the gyro did not turn, keep the constants the robot has
+        if not math.isfinite(values["track_width"]) or values["track_width"] <= 0:
+            logging.warning(
+                f"characterization fit a track width of {values['track_width']},"
+                " not saving it"
+            )
+            self.done()
+            return
+
+        constants.save("drivetrain", values)
+        for key, value in values.items():
+            self.nt.putNumber(key, value)
+        self.done()
+
+    def on_disable(self):
+        self.chassis.setTractionControl(self.chassis.USE_TRACTION_CONTROL)
@@ -0,0 +1,93 @@
+import math
+
+from magicbot import AutonomousStateMachine, state
+from wpilib.controller import RamseteController
+from wpilib.geometry import Pose2d, Rotation2d
+
+from components import chassis, pathrecorder
+
+
+class ReplayPath(AutonomousStateMachine):
+    """Replay the path taught in teleop, see components/pathrecorder.py.
+
+    The path is replayed relative to where the robot starts, so it repeats
+    from any starting pose. A ramsete controller corrects the taught velocity
+    for the tracking error and the result is sent through Chassis velocity
+    control, with the acceleration the taught path plans next so the feedforward
+    does not chase the controller's corrections.
+    """
+
+    MODE_NAME = "Replay Path"
+    DEFAULT = True
+
+    # how far ahead the taught velocity is read to plan the acceleration
+    LOOKAHEAD = 0.02
+
+    chassis: chassis.Chassis
+    path_recorder: pathrecorder.PathRecorder
+
+    def __init__(self):
+        self.path = None
+        self.controller = RamseteController()
+        # taught path start to current start
+        self.offset_x = 0
+        self.offset_y = 0
+        self.offset_heading = 0
+        self.start_x = 0
+        self.start_y = 0
+        self.cos = 1
+        self.sin = 0
+
+    def _reference(self, t):
+        """The taught pose and velocity at time t, moved to the current start."""
+        x, y, heading, velocity, omega = self.path.sample(t)
+        dx = x - self.start_x
+        dy = y - self.start_y
+        return (
+            Pose2d(
+                self.offset_x + dx * self.cos - dy * self.sin,
+                self.offset_y + dx * self.sin + dy * self.cos,
+                Rotation2d(heading + self.offset_heading),
+            ),
+            velocity,
+            omega,
+        )
+
+    @state(first=True)
+    def followPath(self, initial_call, state_tm):
+        if initial_call:
+            self.path = self.path_recorder.getPath()
+            if self.path is None:
+                self.done()
+                return
+            pose = self.chassis.getPose()
+            self.start_x, self.start_y, start_heading, _, _ = self.path.sample(0)
+            self.offset_x = pose.X()
+            self.offset_y = pose.Y()
+            self.offset_heading = pose.rotation().radians() - start_heading
+            self.cos = math.cos(self.offset_heading)
+            self.sin = math.sin(self.offset_heading)
+
+        reference, velocity, omega = self._reference(state_tm)
+        speeds = self.controller.calculate(
+            self.chassis.getPose(), reference, velocity, omega
+        )
+        _, _, _, next_velocity, next_omega = self.path.sample(
+            state_tm + self.LOOKAHEAD
+        )
+        # omega is in the pose's heading convention, which setChassisVelocity
+        # takes, see Chassis
+        self.chassis.setChassisVelocity(
+            speeds.vx,
+            0,
+            speeds.omega,
+            (next_velocity - velocity) / self.LOOKAHEAD,
+            (next_omega - omega) / self.LOOKAHEAD,
+        )
+
+        if self.path.isFinished(state_tm):
+            self.done()
+
+    def done(self):
+        super().done()
+        self.chassis.stop()
@@ -1,3 +1,4 @@
+import logging
 from enum import Enum
 
 import hal
@@ -9,16 +10,20 @@ from wpilib.kinematics import (ChassisSpeeds, DifferentialDriveKinematics,
                                DifferentialDriveOdometry,
                                DifferentialDriveWheelSpeeds)
 
-from utils import lazypigeonimu, lazytalonfx, units
-from controls import motorstate
+from utils import (batterymonitor, constants, lazypigeonimu, lazytalonfx,
+                   odometryworker, robotconstants, talonconfig, units)
+from controls import motorfeedforward, motorstate, tractioncontrol
+from components import loadshedder
 
 class WheelState:
+    __slots__ = ("left", "right")
+
     def __init__(self, left=0, right=0):
         self.left = left
         self.right = right
 
     def norm(self, value):
-        max_output = np.max(np.abs([self.left, self.right]))
+        max_output = max(abs(self.left), abs(self.right))
         if max_output == 0:
             return
         scale = value / max_output
@@ -29,34 +34,47 @@ class WheelState:
         return f"({self.left}, {self.right})"
 
 
-class Chassis:
+class Chassis(robotconstants.ChassisConstants):
+    """Differential drivetrain.
+
+    Heading convention: heading increases when the left side drives forward.
+    physics.py mirrors the drivetrain so the simulated gyro agrees, and
+    setChassisVelocity, TurnToAngle and the Ramsete controller in ReplayPath
+    all assume it. A Pigeon mounted upright reads counter-clockwise positive,
+    the opposite, so execute compares the wheel turn rate with the gyro and
+    flags heading_mismatch when they disagree while turning.
+    """
 
-    # chassis physical constants
-    WHEEL_DIAMETER = 6 * units.inches
-    WHEEL_RADIUS = WHEEL_DIAMETER / 2
-    WHEEL_CIRCUMFERENCE = 2 * np.pi * WHEEL_RADIUS
-    GEAR_RATIO = (48 / 14) * (50 / 16)  # 10.7142861
+    # physical constants are in utils/robotconstants.py
 
-    BUMPER_WIDTH = 3.25 * units.inches
-    ROBOT_WIDTH = 30 * units.inches + BUMPER_WIDTH
-    ROBOT_LENGTH = 30 * units.inches + BUMPER_WIDTH
-    ROBOT_MASS = 100 * units.pounds
+    # characterized constants, see autonomous/characterizedrivetrain.py
+    DRIVETRAIN = constants.load("drivetrain")
 
-    TRACK_WIDTH = 24 * units.inches
+    TRACK_WIDTH = DRIVETRAIN["track_width"] * units.meters
     TRACK_RADIUS = TRACK_WIDTH / 2
 
     # conversions
-    RADIANS_PER_METER = (2 * np.pi * GEAR_RATIO) / WHEEL_CIRCUMFERENCE
-    METERS_PER_RADIAN = WHEEL_CIRCUMFERENCE / (2 * np.pi * GEAR_RATIO)
+    RADIANS_PER_METER = (
+        2 * np.pi * robotconstants.ChassisConstants.GEAR_RATIO
+    ) / robotconstants.ChassisConstants.WHEEL_CIRCUMFERENCE
+    METERS_PER_RADIAN = 1 / RADIANS_PER_METER
 
     # motor config
     LEFT_INVERTED = True
     RIGHT_INVERTED = False
 
     # motor coefs
-    KS = 0.149 * units.volts
-    KV = 2.4 * (units.volts / units.seconds)
-    KA = 0.234 * (units.volts / units.seconds / units.seconds)
+    KS_L = DRIVETRAIN["ks_left"] * units.volts
+    KV_L = DRIVETRAIN["kv_left"] * (units.volts / units.seconds)
+    KA_L = DRIVETRAIN["ka_left"] * (units.volts / units.seconds / units.seconds)
+
+    KS_R = DRIVETRAIN["ks_right"] * units.volts
+    KV_R = DRIVETRAIN["kv_right"] * (units.volts / units.seconds)
+    KA_R = DRIVETRAIN["ka_right"] * (units.volts / units.seconds / units.seconds)
+
+    KS = (KS_L + KS_R) / 2
+    KV = (KV_L + KV_R) / 2
+    KA = (KA_L + KA_R) / 2
 
     # velocity pidf gains
     VL_KP = 0.000363
@@ -79,10 +97,32 @@ class Chassis:
     ds_r: lazytalonfx.LazyTalonFX
 
     imu: lazypigeonimu.LazyPigeonIMU
+    battery: batterymonitor.BatteryMonitor
+
+    load_shedder: loadshedder.LoadShedder
 
     # constraints
     MAX_VELOCITY = 3 * (units.meters / units.seconds)
 
+    # run odometry on its own thread instead of once per loop
+    USE_ODOMETRY_THREAD = True
+
+    # limit the output of a side whose wheels slip
+    USE_TRACTION_CONTROL = True
+
+    # the wheels and gyro must both turn faster than this to compare them
+    HEADING_CHECK_RATE = 1 * (units.radians / units.seconds)
+    # loops of disagreement before the heading convention is flagged
+    HEADING_CHECK_LOOPS = 10
+
+    # scale feedforward by the measured battery voltage instead of a fixed 12 V
+    COMPENSATE_VOLTAGE = True
+    # let the talons compensate instead, full output is then NOMINAL_VOLTAGE.
+    # They correct within the loop, so the drive sags the battery less than
+    # when scaling by a sample that is already a loop old, see
+    # benchmarks/voltagecompensation.py
+    TALON_VOLTAGE_COMPENSATION = True
+
     class _Mode(Enum):
         Idle = 0
         PercentOutput = 1
@@ -92,59 +132,139 @@ class Chassis:
         self.mode = self._Mode.Idle
 
         self.odometry = DifferentialDriveOdometry(Rotation2d.fromDegrees(0))
+        self.kinematics = DifferentialDriveKinematics(self.TRACK_WIDTH)
+        self.odometry_worker = None
 
         self.desired_output = WheelState()
         self.desired_velocity = WheelState()
+        # planned wheel acceleration, None to difference the velocity setpoints
+        self.desired_acceleration = WheelState(None, None)
 
         self.feedforward = WheelState()
+        self.feedforward_l = motorfeedforward.MotorFeedforward(
+            self.KS_L, self.KV_L, self.KA_L
+        )
+        self.feedforward_r = motorfeedforward.MotorFeedforward(
+            self.KS_R, self.KV_R, self.KA_R
+        )
 
         self.wheel_left = motorstate.MotorState()
         self.wheel_right = motorstate.MotorState()
+        self.traction = tractioncontrol.TractionControl(
+            self.TRACK_WIDTH, self.KS, self.KV, self.KA
+        )
+        self.traction_control = self.USE_TRACTION_CONTROL
+        self.heading_disagreements = 0
+        self.heading_mismatch = False
 
         self.nt = NetworkTables.getTable(f"/components/chassis")
+        self.nt_keys = {}
 
-    def setup(self):
-        self.dm_l.setInverted(self.LEFT_INVERTED)
-        self.dm_r.setInverted(self.RIGHT_INVERTED)
+        self.sim_field = None
+        self.sim_outputs = {}
+        self.sim_positions = {}
 
+    def setup(self):
         self.dm_l.setRadiansPerUnit(self.RADIANS_PER_METER)
         self.dm_r.setRadiansPerUnit(self.RADIANS_PER_METER)
 
-        self.dm_l.setPIDF(
+        config_l = talonconfig.TalonConfig(inverted=self.LEFT_INVERTED)
+        config_l.setPIDF(
             0, self.VL_KP, self.VL_KI, self.VL_KD, self.VL_KF,
         )
-        self.dm_r.setPIDF(
+        config_r = talonconfig.TalonConfig(inverted=self.RIGHT_INVERTED)
+        config_r.setPIDF(
             0, self.VR_KP, self.VR_KI, self.VR_KD, self.VR_KF,
         )
+        if self.TALON_VOLTAGE_COMPENSATION:
+            config_l.setVoltageCompensation(self.NOMINAL_VOLTAGE)
+            config_r.setVoltageCompensation(self.NOMINAL_VOLTAGE)
+        self.config_times = talonconfig.configureAll(
+            {self.dm_l: config_l, self.dm_r: config_r}
+        )
+
+        self.load_shedder.register(
+            "chassis", loadshedder.Priority.NetworkTables, self.updateNetworkTables
+        )
+
+        if self.USE_ODOMETRY_THREAD:
+            self.odometry_worker = odometryworker.OdometryWorker(
+                self._sampleOdometry, clock=wpilib.Timer.getFPGATimestamp
+            )
+            self.odometry_worker.start()
 
     def on_enable(self):
-        pass
+        # relearn what the tread holds, the robot may be on another surface
+        self.traction.reset()
 
     def on_disable(self):
         self.stop()
 
+    def shutdown(self) -> None:
+        """Stop the odometry thread, called when the robot program ends."""
+        if self.odometry_worker is not None:
+            self.odometry_worker.stop()
+
     def stop(self) -> None:
         self.mode = self._Mode.Idle
         if wpilib.RobotBase.isSimulation():
             self._setSimulationOutput(1, 0)
             self._setSimulationOutput(3, 0)
 
+    def setTractionControl(self, enabled: bool) -> None:
+        """Turn limiting a slipping side on or off, slip is still detected."""
+        self.traction_control = enabled
+
     def setOutput(self, output_l: float, output_r: float) -> None:
         self.mode = self._Mode.PercentOutput
         self.desired_output.left = output_l
         self.desired_output.right = output_r
 
-    def setWheelVelocity(self, velocity_l: float, velocity_r: float) -> None:
+    def setWheelVelocity(
+        self,
+        velocity_l: float,
+        velocity_r: float,
+        acceleration_l: float = None,
+        acceleration_r: float = None,
+    ) -> None:
+        """Drive each side at a velocity, with the planned acceleration if known."""
         self.mode = self._Mode.Velocity
         self.desired_velocity.left = velocity_l
         self.desired_velocity.right = velocity_r
+        self.desired_acceleration.left = acceleration_l
+        self.desired_acceleration.right = acceleration_r
 
     def setChassisVelocity(
-        self, velocity_x: float, velocity_y: float, velocity_omega
+        self,
+        velocity_x: float,
+        velocity_y: float,
+        velocity_omega,
+        acceleration: float = None,
+        alpha: float = 0,
     ) -> None:
+        """Drive at a robot-relative velocity, omega as the heading turns."""
+        # kinematics takes counter-clockwise positive, the heading convention
+        # is the opposite
         state = ChassisSpeeds(velocity_x, velocity_y, -velocity_omega)
         velocity = self.kinematics.toWheelSpeeds(state)
-        self.setWheelVelocity(velocity.left, velocity.right)
+        if acceleration is None:
+            self.setWheelVelocity(velocity.left, velocity.right)
+        else:
+            # heading increases when the left side drives forward
+            turn = alpha * self.TRACK_RADIUS
+            self.setWheelVelocity(
+                velocity.left, velocity.right, acceleration + turn, acceleration - turn
+            )
+
+    def getOutputVoltage(self) -> float:
+        """The voltage a percent output of 1 puts across the motors."""
+        if self.COMPENSATE_VOLTAGE and not self.TALON_VOLTAGE_COMPENSATION:
+            return self.battery.getVoltage()
+        return self.NOMINAL_VOLTAGE
+
+    def voltsToOutput(self, volts: float) -> float:
+        """Percent output that puts volts across the motors."""
+        return volts / self.getOutputVoltage()
 
     def setTankDrive(self, throttle, rotation):
         self.mode = self._Mode.PercentOutput
@@ -158,8 +278,11 @@ class Chassis:
         self.setTankDrive(throttle, rotation)
 
     def ntPutLeftRight(self, key, value):
-        self.nt.putNumber(f"{key}_left", value.left)
-        self.nt.putNumber(f"{key}_right", value.right)
+        keys = self.nt_keys.get(key)
+        if keys is None:
+            keys = self.nt_keys[key] = (f"{key}_left", f"{key}_right")
+        self.nt.putNumber(keys[0], value.left)
+        self.nt.putNumber(keys[1], value.right)
 
     def updateNetworkTables(self):
         """Update network table values related to component."""
@@ -168,77 +291,183 @@ class Chassis:
         self.ntPutLeftRight("desired_output", self.desired_output)
         self.ntPutLeftRight("desired_velocity", self.desired_velocity)
         self.ntPutLeftRight("feedforward", self.feedforward)
+        self.nt.putBoolean("slipping", self.traction.isSlipping())
+        self.nt.putBoolean("heading_mismatch", self.heading_mismatch)
+        self.nt.putNumber("slip", self.traction.getSlip())
+        self.nt.putNumber("ground_velocity", self.traction.getVelocity())
+        voltage = self.getOutputVoltage()
+        self.nt.putNumber("output_voltage", voltage)
+        self.nt.putNumber(
+            "traction_limit_left",
+            self.traction.getOutputLimit(self.traction.left, voltage),
+        )
+        self.nt.putNumber(
+            "traction_limit_right",
+            self.traction.getOutputLimit(self.traction.right, voltage),
+        )
+        if self.odometry_worker is not None:
+            self.nt.putNumber("odometry_samples", self.odometry_worker.samples)
+            self.nt.putNumber(
+                "odometry_slip_samples", self.odometry_worker.slip_samples
+            )
+            self.nt.putNumber("odometry_overruns", self.odometry_worker.overruns)
 
     def getHeading(self):
-        return self.getPose().rotation().radians()
+        return self.imu.getHeading()
+
+    def _checkHeadingConvention(self):
+        """Flag a gyro that turns the opposite way to the wheels, warns once."""
+        # heading increases when the left side drives forward
+        wheel_rate = (
+            self.wheel_left.velocity - self.wheel_right.velocity
+        ) / self.TRACK_WIDTH
+        gyro_rate = self.imu.getYawRate()
+        if min(abs(wheel_rate), abs(gyro_rate)) < self.HEADING_CHECK_RATE:
+            return
+        if (wheel_rate > 0) == (gyro_rate > 0):
+            self.heading_disagreements = 0
+            return
+        self.heading_disagreements += 1
+        if (
+            self.heading_disagreements >= self.HEADING_CHECK_LOOPS
+            and not self.heading_mismatch
+        ):
+            self.heading_mismatch = True
+            logging.warning(
+                "the gyro turns opposite to the wheels, heading must increase"
+                " when the left side drives forward, see Chassis"
+            )
 
     def getPose(self):
         if wpilib.RobotBase.isSimulation():
-            x = (
-                wpilib.simulation.SimDeviceSim("Field2D").getDouble("x").get()
-                * units.meters
+            x, y, _ = self._getSimulationField()
+            return Pose2d(
+                x.get() * units.meters,
+                y.get() * units.meters,
+                Rotation2d(self.imu.getHeading()),
             )
-            y = (
-                wpilib.simulation.SimDeviceSim("Field2D").getDouble("y").get()
-                * units.meters
-            )
-            rot = (
-                wpilib.simulation.SimDeviceSim("Field2D").getDouble("rot").get()
-                * units.degrees
-            )
-            rot = units.angle_range(rot)
-            return Pose2d(x, y, rot)
+        elif self.odometry_worker is not None:
+            _, x, y, heading = self.odometry_worker.getPose()
+            return Pose2d(x, y, Rotation2d(heading))
         else:
             return self.odometry.getPose()
 
-    def _setSimulationOutput(self, id, output):
-        wpilib.simulation.SimDeviceSim(f"Talon FX[{id}]").getDouble("Motor Output").set(
-            output
+    def _sampleOdometry(self):
+        """Read the wheel positions and gyro for the odometry thread."""
+        timestamp = wpilib.Timer.getFPGATimestamp()
+        if wpilib.RobotBase.isSimulation():
+            left, right = self._getSimulationWheels()
+        else:
+            left = self.dm_l.getPosition()
+            right = self.dm_r.getPosition()
+        # read the gyro directly, the cached heading only updates once per loop
+        gyro = self.imu.readHeading()
+        # flagged by the main loop, the encoders overshoot while slipping
+        ground_velocity = (
+            self.traction.getVelocity() if self.traction.isSlipping() else None
         )
+        return timestamp, left, right, gyro, ground_velocity
+
+    def _getSimulationField(self):
+        # look the sim values up once, they are fetched every loop
+        if self.sim_field is None:
+            field = wpilib.simulation.SimDeviceSim("Field2D")
+            self.sim_field = (
+                field.getDouble("x"),
+                field.getDouble("y"),
+                field.getDouble("rot"),
+            )
+        return self.sim_field
+
+    def _setSimulationOutput(self, id, output):
+        value = self.sim_outputs.get(id)
+        if value is None:
+            value = self.sim_outputs[id] = wpilib.simulation.SimDeviceSim(
+                f"Talon FX[{id}]"
+            ).getDouble("Motor Output")
+        value.set(output)
+
+    def _getSimulationWheels(self):
+        """Simulated (left, right) positions, forward positive.
+
+        physics.py drives its left side from Talon 1 (dm_r) and writes the
+        right side negated to Talon 3 (dm_l), so the sides are swapped back
+        here to pair each output with the wheel it drives.
+        """
+        return -self._getSimulationPosition(3), self._getSimulationPosition(1)
 
     def _getSimulationPosition(self, id):
-        return (
-            wpilib.simulation.SimDeviceSim(f"Custom Talon FX[{id}]")
-            .getDouble("Position")
-            .get()
-        )
+        value = self.sim_positions.get(id)
+        if value is None:
+            value = self.sim_positions[id] = wpilib.simulation.SimDeviceSim(
+                f"Custom Talon FX[{id}]"
+            ).getDouble("Position")
+        return value.get()
 
     def execute(self):
         dt = 0.02
-        self.wheel_left.update(self.dm_l.getPosition(), dt)
-        self.wheel_right.update(self.dm_r.getPosition(), dt)
         if wpilib.RobotBase.isSimulation():
-            self.wheel_left.position = self._getSimulationPosition(1)
-            self.wheel_right.position = self._getSimulationPosition(3)
-
-        self.odometry.update(
-            Rotation2d(self.getHeading()),
-            self.wheel_left.position,
-            self.wheel_right.position,
+            left, right = self._getSimulationWheels()
+        else:
+            left = self.dm_l.getPosition()
+            right = self.dm_r.getPosition()
+        self.wheel_left.update(left, dt)
+        self.wheel_right.update(right, dt)
+
+        traction = self.traction
+        traction.update(
+            self.wheel_left.velocity,
+            self.wheel_right.velocity,
+            self.wheel_left.acceleration,
+            self.wheel_right.acceleration,
+            self.imu.getAcceleration(),
+            self.imu.getYawRate(),
+            dt,
         )
+        self._checkHeadingConvention()
+
+        if self.odometry_worker is None:
+            self.odometry.update(
+                Rotation2d(self.getHeading()),
+                self.wheel_left.position,
+                self.wheel_right.position,
+            )
 
         if self.mode == self._Mode.Idle:
             self.dm_l.setOutput(0)
             self.dm_r.setOutput(0)
         elif self.mode == self._Mode.PercentOutput:
-            self.dm_l.setOutput(self.desired_output.left)
-            self.dm_r.setOutput(self.desired_output.right)
+            output_l = self.desired_output.left
+            output_r = self.desired_output.right
+            if self.traction_control:
+                voltage = self.getOutputVoltage()
+                output_l = traction.limitOutput(traction.left, output_l, voltage)
+                output_r = traction.limitOutput(traction.right, output_r, voltage)
+            self.dm_l.setOutput(output_l)
+            self.dm_r.setOutput(output_r)
         elif self.mode == self._Mode.Velocity:
+            velocity_l = self.desired_velocity.left
+            velocity_r = self.desired_velocity.right
+            if self.traction_control:
+                velocity_l = traction.limitVelocity(traction.left, velocity_l)
+                velocity_r = traction.limitVelocity(traction.right, velocity_r)
+            voltage = self.getOutputVoltage()
             self.feedforward.left = (
-                self.feedforward_l.calculate(self.desired_velocity.left, dt) / 12
+                self.feedforward_l.calculate(
+                    velocity_l, dt, self.desired_acceleration.left
+                )
+                / voltage
             )
-
             self.feedforward.right = (
-                self.feedforward_r.calculate(self.desired_velocity.right, dt) / 12
+                self.feedforward_r.calculate(
+                    velocity_r, dt, self.desired_acceleration.right
+                )
+                / voltage
             )
             if not wpilib.RobotBase.isSimulation():
-                self.dm_l.setVelocity(
-                    self.desired_velocity.left, self.feedforward.left,
-                )
-                self.dm_r.setVelocity(
-                    self.desired_velocity.right, self.feedforward.right,
-                )
+                self.dm_l.setVelocity(velocity_l, self.feedforward.left)
+                self.dm_r.setVelocity(velocity_r, self.feedforward.right)
             else:
-                self.dm_l.setOutput(self.desired_velocity.left / self.MAX_VELOCITY)
-                self.dm_r.setOutput(self.desired_velocity.right / self.MAX_VELOCITY)
-        self.updateNetworkTables()
+                # the simulated talons have no closed loop, run on feedforward
+                self.dm_l.setOutput(self.feedforward.left)
+                self.dm_r.setOutput(self.feedforward.right)
@@ -0,0 +1,129 @@
+from enum import IntEnum
+
+import wpilib
+from networktables import NetworkTables
+
+from utils import telemetry, units
+
+
+class Priority(IntEnum):
+    """Priority of deferrable work, the highest value is shed first."""
+
+    Vision = 1
+    NetworkTables = 2
+    Telemetry = 3
+
+
+class Task:
+    __slots__ = ("name", "priority", "function", "cost", "runs", "deferred")
+
+    def __init__(self, name, priority, function):
+        self.name = name
+        self.priority = priority
+        self.function = function
+        self.cost = 0
+        self.runs = 0
+        self.deferred = 0
+
+
+class LoadShedder:
+    """Run non-critical work only while the loop has time to spare.
+
+    Components register deferrable work with a priority instead of calling it
+    from execute. This component is declared last, so it runs after every
+    control output has been written. When the loop gets close to its budget
+    the shed level goes up and the lowest priority work is deferred; after
+    RECOVERY_LOOPS quiet loops it comes back down one level at a time.
+
+    magicbot runs each mode on a fixed rate notifier, and robotPeriodic is
+    the only hook that runs in every mode, at the end of the loop. The next
+    loop starts on the notifier's next period boundary, counted from when
+    the mode was enabled, or right away if the loop ran past it.
+    """
+
+    # MagicRobot.control_loop_wait_time
+    LOOP_BUDGET = 20 * units.milliseconds
+    SHED_THRESHOLD = 0.8  # of the budget
+    RECOVER_THRESHOLD = 0.5  # of the budget
+    RECOVERY_LOOPS = 25
+    COST_GAIN = 0.2  # filter gain of the per task cost estimate
+
+    MAX_LEVEL = len(Priority)
+
+    def __init__(self):
+        self.tasks = []
+        self.loop_start = 0
+        self.scheduled = 0
+        self.loop_time = 0
+        self.level = 0
+        self.quiet_loops = 0
+        self.sheds = 0
+
+        self.nt = NetworkTables.getTable("/components/loadshedder")
+
+    def setup(self):
+        # only wakes the writer thread, the file is written off the loop
+        self.register("telemetry", Priority.Telemetry, telemetry.log.requestFlush)
+
+    def on_enable(self):
+        self.level = 0
+        self.quiet_loops = 0
+        # the mode's notifier starts counting periods now
+        self.loop_start = self.scheduled = wpilib.Timer.getFPGATimestamp()
+
+    def register(self, name: str, priority: Priority, function) -> None:
+        """Run function every loop that has room for work of this priority."""
+        self.tasks.append(Task(name, priority, function))
+        self.tasks.sort(key=lambda task: task.priority)
+
+    def markLoopEnd(self) -> None:
+        """Called by the robot at the end of every loop, in every mode."""
+        self.scheduled += self.LOOP_BUDGET
+        self.loop_start = max(wpilib.Timer.getFPGATimestamp(), self.scheduled)
+
+    def getLevel(self) -> int:
+        return self.level
+
+    def _updateLevel(self, elapsed):
+        if elapsed >= self.SHED_THRESHOLD * self.LOOP_BUDGET:
+            if self.level < self.MAX_LEVEL:
+                self.level += 1
+                self.sheds += 1
+                telemetry.log.log("shed", level=self.level, elapsed=elapsed)
+            self.quiet_loops = 0
+        elif elapsed <= self.RECOVER_THRESHOLD * self.LOOP_BUDGET:
+            self.quiet_loops += 1
+            if self.level > 0 and self.quiet_loops >= self.RECOVERY_LOOPS:
+                self.level -= 1
+                self.quiet_loops = 0
+                telemetry.log.log("recover", level=self.level, elapsed=elapsed)
+        else:
+            self.quiet_loops = 0
+
+    def execute(self):
+        now = wpilib.Timer.getFPGATimestamp()
+        self._updateLevel(now - self.loop_start)
+
+        # at level n the n lowest priorities are shed
+        max_priority = self.MAX_LEVEL - self.level
+        deadline = self.loop_start + self.SHED_THRESHOLD * self.LOOP_BUDGET
+        for task in self.tasks:
+            if task.priority > max_priority or now + task.cost > deadline:
+                task.deferred += 1
+                continue
+            task.function()
+            end = wpilib.Timer.getFPGATimestamp()
+            task.cost += self.COST_GAIN * ((end - now) - task.cost)
+            task.runs += 1
+            now = end
+
+        self.loop_time = now - self.loop_start
+        self.updateNetworkTables()
+
+    def updateNetworkTables(self):
+        """Always published, this is how shedding is observed."""
+        self.nt.putNumber("level", self.level)
+        self.nt.putNumber("loop_time", self.loop_time)
+        self.nt.putNumber("sheds", self.sheds)
+        for task in self.tasks:
+            self.nt.putNumber(task.name, task.deferred)
@@ -0,0 +1,92 @@
+import wpilib
+from networktables import NetworkTables
+
+from components import chassis, loadshedder
+from controls import recordedpath
+from utils import samplelog, telemetry, units
+
+
+class PathRecorder:
+    """Record the pose stream while the driver teaches a path in teleop.
+
+    When recording stops the log is compressed into waypoints and written to
+    paths/PATH_NAME.json, which autonomous/replaypath.py replays. The saved
+    path is loaded once on boot.
+    """
+
+    chassis: chassis.Chassis
+
+    load_shedder: loadshedder.LoadShedder
+
+    PATH_NAME = "taught"
+
+    # max deviation of the compressed path from the recording
+    TOLERANCE = 5 * units.centimeters
+    # how much a second of timing error or a radian of heading error counts as
+    TIME_SCALE = 0.5 * (units.meters / units.seconds)
+    TURN_SCALE = chassis.Chassis.TRACK_RADIUS
+
+    def __init__(self):
+        self.log = samplelog.SampleLog(recordedpath.FIELDS)
+        self.recording = False
+        self.path = None
+
+        self.nt = NetworkTables.getTable("/components/pathrecorder")
+
+    def setup(self):
+        if recordedpath.RecordedPath.exists(self.PATH_NAME):
+            self.path = recordedpath.RecordedPath.load(self.PATH_NAME)
+        self.load_shedder.register(
+            "pathrecorder", loadshedder.Priority.NetworkTables, self.updateNetworkTables
+        )
+
+    def on_enable(self):
+        pass
+
+    def on_disable(self):
+        if self.recording:
+            self.stop()
+
+    def start(self) -> None:
+        """Start a new recording from the current pose."""
+        self.log.clear()
+        self.recording = True
+
+    def stop(self) -> None:
+        """Stop recording, then compress and save the path."""
+        self.recording = False
+        if self.log.size < 2:
+            return
+        self.path = recordedpath.compress(
+            self.log,
+            self.TOLERANCE,
+            self.TIME_SCALE,
+            self.TURN_SCALE,
+            self.chassis.MAX_VELOCITY,
+        )
+        self.path.save(self.PATH_NAME)
+        telemetry.log.log(
+            "path", name=self.PATH_NAME, samples=self.log.size, waypoints=len(self.path)
+        )
+
+    def isRecording(self) -> bool:
+        return self.recording
+
+    def getPath(self):
+        """The last taught path, or None if nothing has been taught."""
+        return self.path
+
+    def updateNetworkTables(self):
+        self.nt.putBoolean("recording", self.recording)
+        self.nt.putNumber("samples", self.log.size)
+        self.nt.putNumber("waypoints", len(self.path) if self.path is not None else 0)
+
+    def execute(self):
+        if self.recording:
+            pose = self.chassis.getPose()
+            self.log.append(
+                wpilib.Timer.getFPGATimestamp(),
+                pose.X(),
+                pose.Y(),
+                pose.rotation().radians(),
+            )
@@ -0,0 +1,155 @@
+import wpilib
+from networktables import NetworkTables
+
+from components import loadshedder
+from controls import powerbudget
+from utils import batterymonitor, lazytalonfx, robotconstants
+
+
+class PowerManager:
+    """Share a battery current budget between motors to stay out of brownout.
+
+    The battery is modelled as an open circuit voltage behind an internal
+    resistance, both estimated from the measured voltage and total current.
+    The current that keeps the battery above MIN_VOLTAGE is handed out by
+    priority: every consumer gets its minimum, then the rest goes to the
+    highest priority consumers first. Talon supply limits are only rewritten
+    when a consumer's limit moves by at least LIMIT_STEP.
+    """
+
+    MIN_VOLTAGE = robotconstants.PowerConstants.MIN_VOLTAGE
+    BASE_CURRENT = robotconstants.PowerConstants.BASE_CURRENT
+
+    # where the battery model starts
+    MODEL_VOLTAGE = robotconstants.PowerConstants.MODEL_VOLTAGE
+    MODEL_RESISTANCE = robotconstants.PowerConstants.MODEL_RESISTANCE
+
+    LIMIT_STEP = 2  # amps
+
+    # consumer priorities, lower goes first
+    CHASSIS_PRIORITY = 0
+    TURRET_PRIORITY = 1
+
+    # per motor current bounds
+    CHASSIS_MIN_CURRENT = robotconstants.PowerConstants.CHASSIS_MIN_CURRENT
+    CHASSIS_MAX_CURRENT = robotconstants.PowerConstants.CHASSIS_MAX_CURRENT
+    TURRET_MIN_CURRENT = robotconstants.PowerConstants.TURRET_MIN_CURRENT
+    TURRET_MAX_CURRENT = robotconstants.PowerConstants.TURRET_MAX_CURRENT
+
+    # required devices
+    dm_l: lazytalonfx.LazyTalonFX
+    dm_r: lazytalonfx.LazyTalonFX
+    ds_l: lazytalonfx.LazyTalonFX
+    ds_r: lazytalonfx.LazyTalonFX
+    turret_motor: lazytalonfx.LazyTalonFX
+
+    battery: batterymonitor.BatteryMonitor
+    load_shedder: loadshedder.LoadShedder
+
+    def __init__(self):
+        self.consumers = []
+
+        self.voltage = self.MODEL_VOLTAGE
+        self.current = 0
+        self.model = powerbudget.BatteryModel(self.MODEL_VOLTAGE, self.MODEL_RESISTANCE)
+        self.budget = 0
+
+        self.sim_currents = {}
+
+        self.nt = NetworkTables.getTable("/components/powermanager")
+
+    def setup(self):
+        self.register(
+            "chassis",
+            (self.dm_l, self.dm_r, self.ds_l, self.ds_r),
+            self.CHASSIS_PRIORITY,
+            self.CHASSIS_MIN_CURRENT,
+            self.CHASSIS_MAX_CURRENT,
+        )
+        self.register(
+            "turret",
+            (self.turret_motor,),
+            self.TURRET_PRIORITY,
+            self.TURRET_MIN_CURRENT,
+            self.TURRET_MAX_CURRENT,
+        )
+        for consumer in self.consumers:
+            self._applyLimit(consumer, consumer.max_current)
+
+        self.load_shedder.register(
+            "powermanager",
+            loadshedder.Priority.NetworkTables,
+            self.updateNetworkTables,
+        )
+
+    def on_enable(self):
+        pass
+
+    def register(self, name, motors, priority, min_current, max_current):
+        """Add a group of motors to the budget."""
+        self.consumers.append(
+            powerbudget.Consumer(name, motors, priority, min_current, max_current)
+        )
+        self.consumers.sort(key=lambda consumer: consumer.priority)
+
+    def getBatteryVoltage(self):
+        return self.voltage
+
+    def getBudget(self):
+        return self.budget
+
+    def _getMotorCurrent(self, motor):
+        if wpilib.RobotBase.isSimulation():
+            value = self.sim_currents.get(motor.getDeviceID())
+            if value is None:
+                value = self.sim_currents[motor.getDeviceID()] = (
+                    wpilib.simulation.SimDeviceSim(
+                        f"Custom Talon FX[{motor.getDeviceID()}]"
+                    ).getDouble("Supply Current")
+                )
+            return value.get()
+        return motor.getSupplyCurrent()
+
+    def _updateBatteryModel(self):
+        # unfiltered, the resistance estimate needs the voltage under this load
+        self.voltage = self.battery.getRawVoltage()
+        self.current = self.BASE_CURRENT
+        for consumer in self.consumers:
+            for motor in consumer.motors:
+                self.current += self._getMotorCurrent(motor)
+
+        self.model.update(self.voltage, self.current)
+
+    def _applyLimit(self, consumer, limit):
+        if consumer.limit is not None and (
+            limit == consumer.limit
+            # small moves are noise, but always allow going back to full current
+            or (
+                abs(limit - consumer.limit) < self.LIMIT_STEP
+                and limit != consumer.max_current
+            )
+        ):
+            return
+        consumer.limit = limit
+        for motor in consumer.motors:
+            # runtime updates must not block the loop waiting for a response
+            motor.setSupplyCurrentLimit(limit, limit, 0, 0)
+
+    def execute(self):
+        self._updateBatteryModel()
+
+        self.budget = self.model.getBudget(self.MIN_VOLTAGE) - self.BASE_CURRENT
+        for consumer, limit in powerbudget.allocate(self.consumers, self.budget):
+            self._applyLimit(consumer, limit)
+
+    def updateNetworkTables(self):
+        """Update network table values related to component."""
+        self.nt.putNumber("voltage", self.voltage)
+        self.nt.putNumber("current", self.current)
+        self.nt.putNumber("open_circuit_voltage", self.model.open_circuit_voltage)
+        self.nt.putNumber("resistance", self.model.resistance)
+        self.nt.putNumber("budget", self.budget)
+        self.nt.putBoolean("browned_out", self.battery.isBrownedOut())
+        self.nt.putNumber("brownouts", self.battery.getBrownouts())
+        for consumer in self.consumers:
+            self.nt.putNumber(consumer.name, consumer.limit)
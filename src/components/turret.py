@@ -1,8 +1,11 @@
 from enum import Enum
 
-import numpy as np
-from utils import lazytalonfx, units
-from controls import pidf
+import wpilib
+from networktables import NetworkTables
+
+from components import loadshedder
+from utils import lazypigeonimu, lazytalonfx, robotconstants, units
+from controls import headinghold, pidf
 
 
 def findOutput(desired_angle, current_angle):
@@ -11,28 +14,37 @@ def findOutput(desired_angle, current_angle):
     return output
 
 
-class Turret:
+class Turret(robotconstants.TurretConstants):
 
     # required devices
     turret_motor: lazytalonfx.LazyTalonFX
+    imu: lazypigeonimu.LazyPigeonIMU
 
-    KP = 1
-    KI = 0
-    KD = 0
-    KF = 0
+    load_shedder: loadshedder.LoadShedder
 
     class _Mode(Enum):
         Idle = 0
         Heading = 1
+        FieldHeading = 2
 
     def __init__(self):
         self.mode = self._Mode.Idle
         self.desired_output = 0
         self.desired_heading = 0
+        self.desired_field_heading = 0
         self.pidf = pidf.PIDF(self.KP, self.KI, self.KD, self.KF)
+        self.hold = headinghold.HeadingHold(
+            self.KP, self.KI, self.KD, self.MAX_VELOCITY
+        )
+        self.sim_position = None
+
+        self.nt = NetworkTables.getTable("/components/turret")
 
     def setup(self):
-        pass
+        self.turret_motor.setRadiansPerUnit(self.GEAR_RATIO)
+        self.load_shedder.register(
+            "turret", loadshedder.Priority.NetworkTables, self.updateNetworkTables
+        )
 
     def on_enable(self):
         pass
@@ -44,23 +56,55 @@ class Turret:
         self.mode = self._Mode.Idle
 
     def setHeading(self, desired_heading):
+        """Hold a heading relative to the chassis."""
         self.mode = self._Mode.Heading
         self.desired_heading = desired_heading
         self.pidf.setSetpoint(self.desired_heading)
 
+    def setFieldHeading(self, desired_field_heading):
+        """Hold a heading relative to the field while the chassis turns."""
+        if self.mode != self._Mode.FieldHeading:
+            self.hold.reset()
+        self.mode = self._Mode.FieldHeading
+        self.desired_field_heading = desired_field_heading
+
     def getHeading(self):
+        if wpilib.RobotBase.isSimulation():
+            return self._getSimulationPosition()
         return self.turret_motor.getPosition()
 
+    def getFieldHeading(self):
+        return units.angle_range(self.imu.getHeading() + self.getHeading())
+
+    def _getSimulationPosition(self):
+        if self.sim_position is None:
+            self.sim_position = wpilib.simulation.SimDeviceSim(
+                f"Custom Talon FX[{self.turret_motor.getDeviceID()}]"
+            ).getDouble("Position")
+        return self.sim_position.get()
+
     def updateNetworkTables(self):
         """Update network table values related to component."""
-        pass
+        self.nt.putNumber("heading", self.getHeading())
+        self.nt.putNumber("field_heading", self.getFieldHeading())
+        self.nt.putNumber("desired_field_heading", self.desired_field_heading)
+        self.nt.putNumber("feedforward", self.hold.feedforward)
 
     def execute(self):
         if self.mode == self._Mode.Idle:
-            pass
+            self.turret_motor.setOutput(0)
         elif self.mode == self._Mode.Heading:
             cur_heading = self.getHeading()
 
             output = self.pidf.update(cur_heading, 0.02)
 
-            self.turret_motor.set(output)
+            self.turret_motor.setOutput(output)
+        elif self.mode == self._Mode.FieldHeading:
+            output = self.hold.update(
+                self.desired_field_heading,
+                self.imu.getHeading(),
+                self.imu.getYawRate(),
+                self.getHeading(),
+                0.02,
+            )
+            self.turret_motor.setOutput(output)
@@ -0,0 +1,107 @@
+from collections import deque
+
+import wpilib
+from networktables import NetworkTables
+
+from components import loadshedder
+from utils import lazypigeonimu, units
+
+
+class Vision:
+    """Targets published by the coprocessor pipeline in coprocessor/.
+
+    The coprocessor reports how long each frame took from capture to publish.
+    Post-processing turns the camera-relative heading into a field heading
+    using the chassis heading at capture time, so the target does not appear
+    to move while the chassis turns. It is registered with the load shedder and
+    the raw readings stay usable when it is deferred.
+    """
+
+    imu: lazypigeonimu.LazyPigeonIMU
+
+    load_shedder: loadshedder.LoadShedder
+
+    # how long a reading is trusted without a new frame
+    TIMEOUT = 0.5
+    HISTORY_LENGTH = 25  # loops of chassis heading kept for latency compensation
+
+    def __init__(self):
+        self.has_target = False
+        self.distance = 0
+        self.heading = 0
+        self.latency = 0
+        self.led = False
+
+        self.field_heading = 0
+        self.frame = 0
+        self.last_update = -self.TIMEOUT
+        self.heading_history = deque(maxlen=self.HISTORY_LENGTH)
+
+        self.nt = NetworkTables.getTable("/vision")
+        self.nt_processed = NetworkTables.getTable("/components/vision")
+
+    def setup(self):
+        self.load_shedder.register(
+            "vision", loadshedder.Priority.Vision, self.processTarget
+        )
+
+    def on_disable(self):
+        self.enableLED(False)
+
+    def enableLED(self, enabled: bool) -> None:
+        self.led = enabled
+
+    def hasTarget(self) -> bool:
+        return self.has_target
+
+    def getDistance(self) -> float:
+        """Distance to the target in meters."""
+        return self.distance
+
+    def getHeading(self) -> float:
+        """Heading of the target relative to the camera in radians."""
+        return self.heading
+
+    def getLatency(self) -> float:
+        """Seconds from frame capture to publish of the latest reading."""
+        return self.latency
+
+    def getFieldHeading(self) -> float:
+        """Heading of the target relative to the field, latency compensated."""
+        return self.field_heading
+
+    def _headingAt(self, timestamp):
+        """Chassis heading at a past timestamp, from the loop history."""
+        heading = self.imu.getHeading()
+        for sample_time, sample_heading in reversed(self.heading_history):
+            heading = sample_heading
+            if sample_time <= timestamp:
+                break
+        return heading
+
+    def processTarget(self) -> None:
+        if not self.has_target:
+            return
+        capture_time = self.last_update - self.latency
+        self.field_heading = units.angle_range(
+            self._headingAt(capture_time) - self.heading
+        )
+        self.nt_processed.putNumber("field_heading", self.field_heading)
+        self.nt_processed.putNumber("latency", self.latency)
+
+    def execute(self):
+        now = wpilib.Timer.getFPGATimestamp()
+        self.heading_history.append((now, self.imu.getHeading()))
+        self.nt.putBoolean("led", self.led)
+
+        frame = self.nt.getNumber("frame", 0)
+        if frame != self.frame:
+            self.frame = frame
+            self.last_update = now
+        self.latency = self.nt.getNumber("latency", 0)
+        self.distance = self.nt.getNumber("distance", 0)
+        self.heading = self.nt.getNumber("heading", 0)
+        self.has_target = (
+            self.nt.getBoolean("has_target", False)
+            and now - self.last_update <= self.TIMEOUT
+        )
@@ -0,0 +1,71 @@
+import math
+
+
+class ArcOdometry:
+    """Differential drive odometry that integrates each step as a circular arc.
+
+    Heading comes from the gyro and distance from the wheel encoders. Over one
+    step the robot is assumed to drive at constant curvature, which is exact
+    for any step where the wheel speeds did not change.
+    """
+
+    __slots__ = (
+        "x",
+        "y",
+        "heading",
+        "prev_left",
+        "prev_right",
+        "prev_gyro",
+    )
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.heading = 0
+        self.prev_left = 0
+        self.prev_right = 0
+        self.prev_gyro = 0
+
+    def reset(
+        self, x: float, y: float, heading: float, left: float, right: float, gyro: float
+    ) -> None:
+        """Reset the pose, keeping the current encoder and gyro readings as reference."""
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.prev_left = left
+        self.prev_right = right
+        self.prev_gyro = gyro
+
+    def update(
+        self,
+        left: float,
+        right: float,
+        gyro: float,
+        weight: float = 1,
+        estimate: float = 0,
+    ) -> None:
+        """Integrate one step from absolute wheel positions and gyro heading.
+
+        weight is how far the encoders are trusted this step, the rest of the
+        distance travelled comes from estimate, e.g. while the wheels slip.
+        """
+        distance = ((left - self.prev_left) + (right - self.prev_right)) / 2
+        if weight != 1:
+            distance = weight * distance + (1 - weight) * estimate
+        # a gyro that wraps around still gives the short way round
+        dtheta = math.remainder(gyro - self.prev_gyro, 2 * math.pi)
+        self.prev_left = left
+        self.prev_right = right
+        self.prev_gyro = gyro
+
+        # chord of the arc: length distance * sinc(dtheta / 2), pointing halfway
+        half = dtheta / 2
+        if abs(half) < 1e-9:
+            chord = distance
+        else:
+            chord = distance * math.sin(half) / half
+        direction = self.heading + half
+        self.x += chord * math.cos(direction)
+        self.y += chord * math.sin(direction)
+        self.heading += dtheta
@@ -0,0 +1,48 @@
+import numpy as np
+
+# the samples logged by autonomous/characterizedrivetrain.py
+FIELDS = (
+    "time",
+    "test",
+    "voltage_left",
+    "voltage_right",
+    "position_left",
+    "position_right",
+    "heading",
+)
+
+
+def differentiate(time, position, test):
+    """Velocity and acceleration of each test, without crossing between tests."""
+    velocity = np.zeros_like(position)
+    acceleration = np.zeros_like(position)
+    for test_id in np.unique(test):
+        mask = test == test_id
+        if np.count_nonzero(mask) < 3:
+            continue
+        velocity[mask] = np.gradient(position[mask], time[mask])
+        acceleration[mask] = np.gradient(velocity[mask], time[mask])
+    return velocity, acceleration
+
+
+def fitFeedforward(time, test, voltage, position, min_velocity=0.05):
+    """Fit voltage = ks * sign(v) + kv * v + ka * a, returns (ks, kv, ka)."""
+    velocity, acceleration = differentiate(time, position, test)
+    # the first and last samples of each test have one-sided derivatives
+    mask = np.abs(velocity) > min_velocity
+    a = np.column_stack((np.sign(velocity[mask]), velocity[mask], acceleration[mask]))
+    (ks, kv, ka), *_ = np.linalg.lstsq(a, voltage[mask], rcond=None)
+    return ks, kv, ka
+
+
+def fitTrackWidth(position_left, position_right, heading):
+    """Fit the effective track width from turning in place."""
+    # each wheel travels track_width / 2 per radian of rotation
+    travel = (
+        np.abs(position_left - position_left[0])
+        + np.abs(position_right - position_right[0])
+    ) / 2
+    # the heading wraps around at pi
+    heading = np.unwrap(heading)
+    rotation = np.abs(heading - heading[0])
+    return 2 * np.dot(rotation, travel) / np.dot(rotation, rotation)
@@ -0,0 +1,41 @@
+import math
+
+from controls import pidf
+from utils import units
+
+
+class HeadingHold:
+    """Hold a mechanism on a field-relative heading while the chassis turns.
+
+    The mechanism angle is measured relative to the chassis, so its setpoint
+    is the field heading minus the chassis heading. The chassis yaw rate is
+    fed forward so the mechanism counter-rotates in the same loop instead of
+    waiting for the error to build up.
+    """
+
+    def __init__(self, kp, ki, kd, max_velocity):
+        self.pidf = pidf.PIDF(kp, ki, kd, 0, True, -math.pi, math.pi)
+        self.pidf.setOutputRange(-1, 1)
+        self.max_velocity = max_velocity
+
+        self.setpoint = 0
+        self.feedforward = 0
+
+    def reset(self) -> None:
+        self.pidf.reset()
+
+    def update(
+        self,
+        field_heading: float,
+        chassis_heading: float,
+        chassis_rate: float,
+        angle: float,
+        dt: float,
+        use_feedforward: bool = True,
+    ) -> float:
+        """Percent output that holds angle (relative to the chassis) on field_heading."""
+        self.setpoint = units.angle_range(field_heading - chassis_heading)
+        self.pidf.setSetpoint(self.setpoint, reset=False)
+        feedback = self.pidf.update(units.angle_range(angle), dt)
+        self.feedforward = -chassis_rate / self.max_velocity if use_feedforward else 0
+        return min(max(feedback + self.feedforward, -1), 1)
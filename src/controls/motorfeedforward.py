@@ -1,17 +1,31 @@
-from wpilib.controller import SimpleMotorFeedforwardMeters
+import math
 
 
 class MotorFeedforward:
+    """Feedforward for a motor following V = KS * sign(v) + KV * v + KA * a."""
+
     def __init__(self, ks, kv, ka):
-        self.model = SimpleMotorFeedforwardMeters(ks, kv, ka)
+        self.ks = ks
+        self.kv = kv
+        self.ka = ka
         self.desired_velocity = 0
         self.prev_desired_velocity = 0
         self.desired_acceleration = 0
 
-    def calculate(self, desired_velocity, dt):
+    def calculate(self, desired_velocity, dt, desired_acceleration=None):
+        """Voltage to follow a velocity setpoint.
+
+        desired_acceleration should come from the planned trajectory. Without
+        one, it is estimated by differencing the last two setpoints, which
+        lags a loop and picks up every jump in the feedback correction.
+        """
+        if desired_acceleration is None:
+            desired_acceleration = (desired_velocity - self.prev_desired_velocity) / dt
         self.desired_velocity = desired_velocity
-        self.desired_acceleration = (
-            self.desired_velocity - self.prev_desired_velocity
-        ) / dt
-        self.prev_desired_velocity = self.desired_velocity
-        return self.model.calculate(self.desired_velocity, self.desired_acceleration)
+        self.desired_acceleration = desired_acceleration
+        self.prev_desired_velocity = desired_velocity
+        if desired_velocity:
+            static = math.copysign(self.ks, desired_velocity)
+        else:
+            static = 0
+        return static + self.kv * desired_velocity + self.ka * desired_acceleration
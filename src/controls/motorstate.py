@@ -1,10 +1,20 @@
 class MotorState:
+    __slots__ = (
+        "position",
+        "prev_position",
+        "velocity",
+        "prev_velocity",
+        "acceleration",
+        "nt_keys",
+    )
+
     def __init__(self):
         self.position = 0
         self.prev_position = 0
         self.velocity = 0
         self.prev_velocity = 0
         self.acceleration = 0
+        self.nt_keys = {}
 
     def update(self, position, dt):
         self.position = position
@@ -14,6 +24,13 @@ class MotorState:
         self.prev_position = self.position
 
     def putNT(self, nt, name):
-        nt.putNumber(f"{name}_position", self.position)
-        nt.putNumber(f"{name}_velocity", self.velocity)
-        nt.putNumber(f"{name}_acceleration", self.acceleration)
+        keys = self.nt_keys.get(name)
+        if keys is None:
+            keys = self.nt_keys[name] = (
+                f"{name}_position",
+                f"{name}_velocity",
+                f"{name}_acceleration",
+            )
+        nt.putNumber(keys[0], self.position)
+        nt.putNumber(keys[1], self.velocity)
+        nt.putNumber(keys[2], self.acceleration)
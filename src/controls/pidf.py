@@ -1,3 +1,5 @@
+import math
+
 import numpy as np
 
 
@@ -32,8 +34,8 @@ class PIDF:
         self.min_in = min_in
         self.max_in = max_in
 
-        self.min_out = np.NINF
-        self.max_out = np.Inf
+        self.min_out = -math.inf
+        self.max_out = math.inf
 
     def update(self, input: float, dt: float) -> float:
         """Update the PIDF controller."""
@@ -57,12 +59,13 @@ class PIDF:
             + (self.kd * self.derivative)
             + (self.kf * self.setpoint)
         )
-        self.output = np.clip(output, self.min_out, self.max_out)
+        self.output = min(max(output, self.min_out), self.max_out)
         return self.output
 
-    def setSetpoint(self, setpoint: float) -> None:
-        """Set the desired setpoint."""
-        self.reset()
+    def setSetpoint(self, setpoint: float, reset: bool = True) -> None:
+        """Set the desired setpoint, resetting the controller unless told not to."""
+        if reset:
+            self.reset()
         self.setpoint = setpoint
 
     def setOutputRange(self, min_out: float, max_out: float) -> None:
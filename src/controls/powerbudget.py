@@ -0,0 +1,69 @@
+class Consumer:
+    """A group of motors that shares one slice of the current budget."""
+
+    __slots__ = ("name", "motors", "priority", "min_current", "max_current", "limit")
+
+    def __init__(self, name, motors, priority, min_current, max_current):
+        self.name = name
+        self.motors = motors
+        self.priority = priority
+        self.min_current = min_current
+        self.max_current = max_current
+        self.limit = None
+
+
+class BatteryModel:
+    """An open circuit voltage behind an internal resistance.
+
+    Both are estimated from the measured voltage and total current: a big
+    enough change in load shows the resistance, and the voltage under load
+    plus the drop across it gives the open circuit voltage.
+    """
+
+    MIN_RESISTANCE = 0.005  # ohms
+    MAX_RESISTANCE = 0.1  # ohms
+    RESISTANCE_GAIN = 0.05  # filter gain of the resistance estimate
+    VOLTAGE_GAIN = 0.1  # filter gain of the open circuit voltage estimate
+    MIN_CURRENT_STEP = 20  # amps of change needed to estimate resistance
+
+    def __init__(self, voltage: float, resistance: float):
+        self.open_circuit_voltage = voltage
+        self.resistance = resistance
+
+        self.prev_voltage = voltage
+        self.prev_current = 0
+
+    def update(self, voltage: float, current: float) -> None:
+        """Fold in a sample of the voltage under the total current."""
+        current_step = current - self.prev_current
+        if abs(current_step) >= self.MIN_CURRENT_STEP:
+            resistance = -(voltage - self.prev_voltage) / current_step
+            resistance = min(max(resistance, self.MIN_RESISTANCE), self.MAX_RESISTANCE)
+            self.resistance += self.RESISTANCE_GAIN * (resistance - self.resistance)
+        self.prev_voltage = voltage
+        self.prev_current = current
+
+        open_circuit_voltage = voltage + current * self.resistance
+        self.open_circuit_voltage += self.VOLTAGE_GAIN * (
+            open_circuit_voltage - self.open_circuit_voltage
+        )
+
+    def getBudget(self, min_voltage: float) -> float:
+        """The total current that keeps the battery at min_voltage."""
+        return (self.open_circuit_voltage - min_voltage) / self.resistance
+
+
+def allocate(consumers, budget):
+    """Split budget amps into (consumer, per motor limit) pairs.
+
+    consumers must be sorted by priority. Every consumer gets its minimum,
+    then the rest goes to the highest priority consumers first.
+    """
+    remaining = budget
+    for consumer in consumers:
+        remaining -= consumer.min_current * len(consumer.motors)
+    for consumer in consumers:
+        extra = (consumer.max_current - consumer.min_current) * len(consumer.motors)
+        extra = min(max(remaining, 0), extra)
+        remaining -= extra
+        yield consumer, round(consumer.min_current + extra / len(consumer.motors))
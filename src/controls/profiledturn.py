@@ -0,0 +1,50 @@
+from controls import motorfeedforward, trapezoidprofile
+
+
+class ProfiledTurn:
+    """Turn in place along a trapezoid heading profile, used by TurnToAngle.
+
+    The profile limits come from the drivetrain feedforward, splitting
+    profile_voltage between cruising and accelerating. Each update corrects
+    the profile's turn rate for the heading error and returns the voltage for
+    the left side, the right side takes the opposite. Heading increases when
+    the left side drives forward, as in Chassis.
+    """
+
+    def __init__(
+        self,
+        ks: float,
+        kv: float,
+        ka: float,
+        track_radius: float,
+        profile_voltage: float,
+        cruise_fraction: float,
+        kp: float,
+    ):
+        self.track_radius = track_radius
+        self.kp = kp
+        # the chassis turns in place, so each wheel travels track_radius per radian
+        max_wheel_velocity = cruise_fraction * (profile_voltage - ks) / kv
+        max_wheel_acceleration = (1 - cruise_fraction) * (profile_voltage - ks) / ka
+        self.profile = trapezoidprofile.TrapezoidProfile(
+            max_wheel_velocity / track_radius, max_wheel_acceleration / track_radius
+        )
+        self.feedforward = motorfeedforward.MotorFeedforward(ks, kv, ka)
+
+        self.reference = 0
+        self.reference_velocity = 0
+
+    def plan(self, heading: float, goal: float) -> float:
+        """Plan a turn from heading to goal and return its duration."""
+        return self.profile.plan(heading, goal)
+
+    def update(self, t: float, heading: float, dt: float) -> float:
+        """Left side voltage to follow the profile at time t."""
+        self.reference, self.reference_velocity, alpha = self.profile.sample(t)
+        omega = self.reference_velocity + self.kp * (self.reference - heading)
+        return self.feedforward.calculate(
+            omega * self.track_radius, dt, alpha * self.track_radius
+        )
+
+    def isFinished(self, t: float) -> bool:
+        return self.profile.isFinished(t)
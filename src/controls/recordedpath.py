@@ -0,0 +1,152 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+PATHS_DIR = Path(__file__).resolve().parents[1] / "paths"
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indices of the points kept by Douglas-Peucker simplification.
+
+    points is (n, dims), every dimension must be in the same units as tolerance.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1 : end]
+        segment = points[end] - points[start]
+        length_sq = np.dot(segment, segment)
+        offset = inner - points[start]
+        if length_sq > 0:
+            t = np.clip(offset @ segment / length_sq, 0, 1)
+            offset = offset - t[:, None] * segment
+        distance = np.einsum("ij,ij->i", offset, offset)
+        farthest = np.argmax(distance)
+        if distance[farthest] > tolerance ** 2:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return np.flatnonzero(keep)
+
+
+# the pose stream logged by components/pathrecorder.py
+FIELDS = ("time", "x", "y", "heading")
+
+
+def compress(
+    log, tolerance: float, time_scale: float, turn_scale: float, max_velocity
+) -> "RecordedPath":
+    """Simplify a log of FIELDS into a path of waypoints.
+
+    Time and heading are simplified along with position, scaled to meters
+    by time_scale (m/s) and turn_scale (m/rad), so pauses and turns in
+    place are kept. Segments faster than max_velocity are slowed down here
+    so the path never has to be adjusted on the robot.
+    """
+    time = log["time"] - log["time"][0]
+    heading = np.unwrap(log["heading"])
+    points = np.column_stack(
+        (log["x"], log["y"], heading * turn_scale, time * time_scale)
+    )
+    kept = simplify(points, tolerance)
+
+    x = log["x"][kept]
+    y = log["y"][kept]
+    heading = heading[kept]
+    durations = np.diff(time[kept])
+    lengths = np.hypot(np.diff(x), np.diff(y))
+    durations = np.maximum(durations, lengths / max_velocity)
+    time = np.concatenate(([0], np.cumsum(durations)))
+    return RecordedPath(time, x, y, heading)
+
+
+class RecordedPath:
+    """A taught path, replayed as a time-parameterized trajectory.
+
+    Between waypoints the robot moves at constant velocity in a straight line
+    while its heading turns at a constant rate, as it did on average while the
+    path was taught.
+    """
+
+    def __init__(self, time, x, y, heading):
+        self.time = np.asarray(time, dtype=float)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.heading = np.asarray(heading, dtype=float)
+        self.total_time = float(self.time[-1])
+
+        durations = np.diff(self.time)
+        durations[durations == 0] = math.inf
+        dx = np.diff(self.x)
+        dy = np.diff(self.y)
+        # drive backwards when the segment points away from the robot
+        mid_heading = self.heading[:-1] + np.diff(self.heading) / 2
+        direction = np.where(
+            dx * np.cos(mid_heading) + dy * np.sin(mid_heading) < 0, -1, 1
+        )
+        self.velocity = (direction * np.hypot(dx, dy) / durations).tolist()
+        self.omega = (np.diff(self.heading) / durations).tolist()
+        # plain lists are faster to index from the loop than numpy arrays
+        self.times = self.time.tolist()
+        self.segment = 0
+
+    def __len__(self):
+        return len(self.times)
+
+    def sample(self, t: float):
+        """Get the (x, y, heading, velocity, omega) of the path at time t."""
+        times = self.times
+        if t >= self.total_time:
+            return float(self.x[-1]), float(self.y[-1]), float(self.heading[-1]), 0, 0
+        t = max(t, 0)
+        # replay moves forward in time, so start from the last segment
+        i = self.segment if times[self.segment] <= t else 0
+        while times[i + 1] <= t:
+            i += 1
+        self.segment = i
+
+        fraction = (t - times[i]) / (times[i + 1] - times[i])
+        return (
+            float(self.x[i] + fraction * (self.x[i + 1] - self.x[i])),
+            float(self.y[i] + fraction * (self.y[i + 1] - self.y[i])),
+            float(self.heading[i] + fraction * (self.heading[i + 1] - self.heading[i])),
+            self.velocity[i],
+            self.omega[i],
+        )
+
+    def isFinished(self, t: float) -> bool:
+        return t >= self.total_time
+
+    def save(self, name: str) -> None:
+        """Write the waypoints to paths/<name>.json, replacing it atomically."""
+        PATHS_DIR.mkdir(exist_ok=True)
+        path = PATHS_DIR / f"{name}.json"
+        tmp = path.with_suffix(".tmp")
+        values = {
+            "time": np.round(self.time, 3).tolist(),
+            "x": np.round(self.x, 3).tolist(),
+            "y": np.round(self.y, 3).tolist(),
+            "heading": np.round(self.heading, 4).tolist(),
+        }
+        with open(tmp, "w") as f:
+            json.dump(values, f, separators=(",", ":"))
+            f.write("\n")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, name: str) -> "RecordedPath":
+        """Read waypoints written by save, nothing is recomputed."""
+        with open(PATHS_DIR / f"{name}.json") as f:
+            values = json.load(f)
+        return cls(values["time"], values["x"], values["y"], values["heading"])
+
+    @staticmethod
+    def exists(name: str) -> bool:
+        return (PATHS_DIR / f"{name}.json").exists()
@@ -0,0 +1,203 @@
+import math
+
+
+class SideTraction:
+    __slots__ = (
+        "expected",
+        "slip",
+        "slipping",
+        "acceleration_limit",
+        "grip_limit",
+        "slip_samples",
+    )
+
+    def __init__(self):
+        self.expected = 0
+        self.slip = 0
+        self.slipping = False
+        self.acceleration_limit = math.inf
+        self.grip_limit = math.inf
+        self.slip_samples = 0
+
+
+class TractionControl:
+    """Detect wheel slip from encoder and IMU motion and limit the slipping side.
+
+    The ground velocity of the chassis is estimated by integrating the IMU
+    acceleration and pulling the estimate toward the wheels that still grip.
+    Each side is expected to move at that velocity plus its share of the
+    IMU yaw rate. A side slips when its wheels run away from that, or
+    accelerate much faster than the IMU says the chassis does.
+
+    The side's output is capped to the feedforward voltage for an
+    acceleration limit at the current ground speed. When an uncapped side
+    slips, the chassis only gets kinetic friction out of it, so what the IMU
+    reads is a lower bound on what the tread holds and the cap starts there.
+    The cap is raised gradually while the side grips. When the side breaks
+    loose again under the cap, the cap it broke loose at is just above what
+    the tread holds statically: the cap drops SLIP_BACKOFF below it and stays
+    there, without ramping up again, until reset(). A side that never slips
+    under the cap has it lifted once it is well past anything the tread
+    could slip at.
+
+    Heading increases when the left side drives forward, as in TurnToAngle.
+    """
+
+    SLIP_VELOCITY = 0.4  # m/s of wheel speed over ground speed
+    SLIP_ACCELERATION = 2  # m/s^2 of wheel acceleration over the imu
+    GRIP_VELOCITY = 0.15  # m/s, slip clears below this
+
+    # held acceleration cap, relative to the cap a side broke loose at
+    SLIP_BACKOFF = 0.93
+    PEAK_DECAY = 20  # m/s^2 per second
+    MIN_ACCELERATION = 2  # m/s^2
+    ACCELERATION_RECOVERY = 15  # m/s^2 per second while gripping
+    MAX_ACCELERATION = 20  # m/s^2, the cap is lifted past this
+
+    NOMINAL_VOLTAGE = 12
+
+    # how fast the velocity estimate follows gripping wheels
+    VELOCITY_GAIN = 0.2
+
+    def __init__(self, track_width: float, ks: float, kv: float, ka: float):
+        self.track_radius = track_width / 2
+        self.ks = ks
+        self.kv = kv
+        self.ka = ka
+
+        self.left = SideTraction()
+        self.right = SideTraction()
+        self.velocity = 0
+        self.prev_imu_acceleration = 0
+        self.peak_acceleration = 0
+        self.dt = 0
+
+    def reset(self, velocity: float = 0) -> None:
+        self.velocity = velocity
+        for side in (self.left, self.right):
+            side.slipping = False
+            side.acceleration_limit = math.inf
+            side.grip_limit = math.inf
+
+    def _detect(self, side, velocity, acceleration, lag, imu_acceleration):
+        # the encoder velocity is a backward difference, half a loop old
+        side.slip = velocity - (side.expected - lag)
+        excess = acceleration - imu_acceleration
+        runaway = abs(excess) > self.SLIP_ACCELERATION and excess * side.slip > 0
+        if abs(side.slip) > self.SLIP_VELOCITY or runaway:
+            side.slipping = True
+        elif abs(side.slip) < self.GRIP_VELOCITY:
+            side.slipping = False
+
+    def _limit(self, side, was_slipping, dt):
+        if side.slipping:
+            side.slip_samples += 1
+            if was_slipping:
+                # the cap is kept until the side grips again
+                return
+            if side.acceleration_limit < math.inf:
+                # it broke loose under the cap, so the tread holds a bit less
+                side.grip_limit = max(
+                    self.SLIP_BACKOFF * side.acceleration_limit, self.MIN_ACCELERATION
+                )
+                side.acceleration_limit = side.grip_limit
+            else:
+                # sliding, the chassis gets less than the tread held
+                side.acceleration_limit = max(
+                    self.peak_acceleration, self.MIN_ACCELERATION
+                )
+        elif side.acceleration_limit < side.grip_limit:
+            side.acceleration_limit = min(
+                side.acceleration_limit + self.ACCELERATION_RECOVERY * dt,
+                side.grip_limit,
+            )
+            if side.acceleration_limit > self.MAX_ACCELERATION:
+                side.acceleration_limit = math.inf
+
+    def update(
+        self,
+        velocity_l: float,
+        velocity_r: float,
+        acceleration_l: float,
+        acceleration_r: float,
+        imu_acceleration: float,
+        yaw_rate: float,
+        dt: float,
+    ) -> None:
+        """Update slip detection from wheel and IMU motion, once per loop."""
+        self.dt = dt
+        self.velocity += imu_acceleration * dt
+        self.peak_acceleration = max(
+            abs(imu_acceleration), self.peak_acceleration - self.PEAK_DECAY * dt
+        )
+        turn = yaw_rate * self.track_radius
+        left = self.left
+        right = self.right
+        left.expected = self.velocity + turn
+        right.expected = self.velocity - turn
+
+        # the encoder acceleration is a loop older than the imu reading
+        lag = imu_acceleration * dt / 2
+        prev = self.prev_imu_acceleration
+        self.prev_imu_acceleration = imu_acceleration
+        was_slipping_l = left.slipping
+        was_slipping_r = right.slipping
+        self._detect(left, velocity_l, acceleration_l, lag, prev)
+        self._detect(right, velocity_r, acceleration_r, lag, prev)
+
+        # the imu drifts, so trust whichever wheels still grip
+        if not left.slipping and not right.slipping:
+            measured = (velocity_l + velocity_r) / 2 + lag
+        elif not left.slipping:
+            measured = velocity_l + lag - turn
+        elif not right.slipping:
+            measured = velocity_r + lag + turn
+        else:
+            measured = self.velocity
+        self.velocity += self.VELOCITY_GAIN * (measured - self.velocity)
+        left.expected = self.velocity + turn
+        right.expected = self.velocity - turn
+
+        self._limit(left, was_slipping_l, dt)
+        self._limit(right, was_slipping_r, dt)
+
+    def isSlipping(self) -> bool:
+        return self.left.slipping or self.right.slipping
+
+    def getVelocity(self) -> float:
+        """Estimated ground velocity of the chassis center."""
+        return self.velocity
+
+    def getSlip(self) -> float:
+        """Largest slip of either side in m/s."""
+        return max(abs(self.left.slip), abs(self.right.slip))
+
+    def getOutputLimit(
+        self, side: SideTraction, voltage: float = NOMINAL_VOLTAGE
+    ) -> float:
+        """Max percent output the side can put down without slipping.
+
+        voltage is what a percent output of 1 puts across the motors.
+        """
+        if side.acceleration_limit == math.inf:
+            return 1
+        # the output holds until the next loop, aim for the speed halfway there
+        velocity = abs(side.expected) + side.acceleration_limit * self.dt / 2
+        volts = self.ks + self.kv * velocity + self.ka * side.acceleration_limit
+        return min(volts / voltage, 1)
+
+    def limitOutput(
+        self, side: SideTraction, output: float, voltage: float = NOMINAL_VOLTAGE
+    ) -> float:
+        """Clamp a percent output to what the side can put down."""
+        limit = self.getOutputLimit(side, voltage)
+        return max(-limit, min(output, limit))
+
+    def limitVelocity(self, side: SideTraction, velocity: float) -> float:
+        """Keep a slipping side's velocity setpoint close to the ground."""
+        if not side.slipping:
+            return velocity
+        return max(
+            side.expected - self.SLIP_VELOCITY,
+            min(velocity, side.expected + self.SLIP_VELOCITY),
+        )
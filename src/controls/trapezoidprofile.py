@@ -0,0 +1,65 @@
+import math
+
+
+class TrapezoidProfile:
+    """A time-optimal rest-to-rest motion profile with velocity and acceleration limits."""
+
+    def __init__(self, max_velocity: float, max_acceleration: float):
+        self.max_velocity = max_velocity
+        self.max_acceleration = max_acceleration
+
+        self.start = 0
+        self.goal = 0
+        self.direction = 1
+        self.cruise_velocity = 0
+        self.accel_time = 0
+        self.cruise_time = 0
+        self.total_time = 0
+
+    def plan(self, start: float, goal: float) -> float:
+        """Plan a profile from start to goal and return its duration."""
+        self.start = start
+        self.goal = goal
+        distance = abs(goal - start)
+        self.direction = 1 if goal >= start else -1
+
+        accel_distance = self.max_velocity ** 2 / self.max_acceleration
+        if distance >= accel_distance:
+            # trapezoid, reaches max velocity
+            self.cruise_velocity = self.max_velocity
+            self.accel_time = self.max_velocity / self.max_acceleration
+            self.cruise_time = (distance - accel_distance) / self.max_velocity
+        else:
+            # triangle, never reaches max velocity
+            self.cruise_velocity = math.sqrt(distance * self.max_acceleration)
+            self.accel_time = self.cruise_velocity / self.max_acceleration
+            self.cruise_time = 0
+        self.total_time = 2 * self.accel_time + self.cruise_time
+        return self.total_time
+
+    def sample(self, t: float):
+        """Get the (position, velocity, acceleration) of the profile at time t."""
+        a = self.max_acceleration
+        v = self.cruise_velocity
+        if t <= 0:
+            return self.start, 0, 0
+        if t < self.accel_time:
+            pos = a * t ** 2 / 2
+            vel = a * t
+            acc = a
+        elif t < self.accel_time + self.cruise_time:
+            pos = v * self.accel_time / 2 + v * (t - self.accel_time)
+            vel = v
+            acc = 0
+        elif t < self.total_time:
+            remaining = self.total_time - t
+            pos = abs(self.goal - self.start) - a * remaining ** 2 / 2
+            vel = a * remaining
+            acc = -a
+        else:
+            return self.goal, 0, 0
+        d = self.direction
+        return self.start + d * pos, d * vel, d * acc
+
+    def isFinished(self, t: float) -> bool:
+        return t >= self.total_time
@@ -10,19 +10,35 @@
 #
 
 import hal.simulation
-from pyfrc.physics import motor_cfgs, tankmodel
+from networktables import NetworkTables
 from pyfrc.physics.core import PhysicsInterface
-from pyfrc.physics.units import units
+from wpilib.geometry import Rotation2d, Transform2d, Translation2d
 
-from components import chassis
+from components import chassis, turret
+from sim import battery, drivetrain, fieldmap
+from utils import constants, robotconstants
 
 talon0 = hal.SimDevice("Custom Talon FX[1]")
 talon1 = hal.SimDevice("Custom Talon FX[3]")
 talon0.createDouble("Position", False, 0)
 talon1.createDouble("Position", False, 0)
+
+# supply current of every motor, read by the power manager
+talon_devices = {
+    0: hal.SimDevice("Custom Talon FX[0]"),
+    1: talon0,
+    2: hal.SimDevice("Custom Talon FX[2]"),
+    3: talon1,
+    4: hal.SimDevice("Custom Talon FX[4]"),
+}
+talon_currents = {
+    id: device.createDouble("Supply Current", False, 0)
+    for id, device in talon_devices.items()
+}
+turret_position = talon_devices[4].createDouble("Position", False, 0)
 import wpilib.simulation
 
-class PhysicsEngine:
+class PhysicsEngine(robotconstants.SimConstants):
     """
         Simulates a motor moving something that strikes two limit switches,
         one on each end of the track. Obviously, this is not particularly
@@ -40,23 +56,46 @@ class PhysicsEngine:
             pose.rotation().degrees()
         )
 
-    def __init__(self, physics_controller: PhysicsInterface):
+    def __init__(self, physics_controller: PhysicsInterface, robot):
 
         self.physics_controller = physics_controller
-
-        self.drivetrain = tankmodel.TankModel.theory(
-            motor_cfgs.MOTOR_CFG_FALCON_500,  # motor configuration
-            chassis.Chassis.ROBOT_MASS * units.kilogram,  # robot mass
-            chassis.Chassis.GEAR_RATIO,  # drivetrain gear ratio
-            2,  # motors per side
-            chassis.Chassis.TRACK_WIDTH * units.meter,  # robot wheelbase
-            chassis.Chassis.ROBOT_WIDTH * units.meter,  # robot width
-            chassis.Chassis.ROBOT_LENGTH * units.meter,  # robot length
-            chassis.Chassis.WHEEL_RADIUS * units.meter,  # wheel diameter
+        self.robot = robot
+        physics_controller.move_robot(
+            Transform2d(Translation2d(self.START_X, self.START_Y), Rotation2d(0))
         )
+
         self.wheel_position = chassis.WheelState()
         self.wheel_velocity = chassis.WheelState()
 
+        # simulate the drivetrain the characterization last measured
+        coefs = constants.load("drivetrain")
+        self.drive = drivetrain.DrivetrainSim(
+            (coefs["ks_left"], coefs["kv_left"], coefs["ka_left"]),
+            (coefs["ks_right"], coefs["kv_right"], coefs["ka_right"]),
+            chassis.Chassis.ROBOT_MASS,
+            coefs["track_width"],
+            chassis.Chassis.WHEEL_RADIUS,
+            chassis.Chassis.GEAR_RATIO,
+            friction=self.FRICTION_COEFFICIENT,
+        )
+        self.battery = battery.BatterySim(self.BATTERY_VOLTAGE, self.BATTERY_RESISTANCE)
+        self.battery_voltage = self.BATTERY_VOLTAGE
+        self.in_brownout = False
+        self.brownouts = 0
+        self.max_acceleration = 0
+
+        self.turret_velocity = 0
+        self.turret_position = 0
+
+        self.field = fieldmap.FieldMap() if self.USE_COLLISIONS else None
+        self.footprint = fieldmap.Footprint(
+            chassis.Chassis.ROBOT_LENGTH, chassis.Chassis.ROBOT_WIDTH
+        )
+        self.prev_pose = None
+        self.in_contact = False
+        self.contacts = 0
+        self.nt = NetworkTables.getTable("/physics")
+
     def getMotorSpeed(self, id):
         return (
             wpilib.simulation.SimDeviceSim(f"Talon FX[{id}]")
@@ -69,6 +108,76 @@ class PhysicsEngine:
             position
         )
 
+    def getSupplyLimit(self, motor):
+        """The supply current limit the robot code last configured on a Talon."""
+        if motor.supply_current_limit is None:
+            return None
+        return motor.supply_current_limit[0]
+
+    def getDriveOutput(self, id):
+        """Drive motor output as a share of the battery voltage."""
+        output = self.getMotorSpeed(id)
+        if chassis.Chassis.TALON_VOLTAGE_COMPENSATION:
+            # the talon scales its output to the nominal voltage it can reach
+            output *= chassis.Chassis.NOMINAL_VOLTAGE / self.battery_voltage
+            output = max(-1, min(output, 1))
+        return output
+
+    def updateTurret(self, tm_diff):
+        """A first order turret that settles to its output times full speed."""
+        target = (
+            self.getMotorSpeed(4)
+            * turret.Turret.MAX_VELOCITY
+            * self.battery_voltage
+            / 12
+        )
+        self.turret_velocity += (
+            (target - self.turret_velocity) * tm_diff / self.TURRET_TIME_CONSTANT
+        )
+        self.turret_position += self.turret_velocity * tm_diff
+        turret_position.set(self.turret_position)
+
+    def updateBattery(self, tm_diff):
+        """Sag the battery under the current drawn by every motor, and as it drains."""
+        currents = {
+            0: self.drive.left.supply_current,
+            1: self.drive.left.supply_current,
+            2: self.drive.right.supply_current,
+            3: self.drive.right.supply_current,
+            4: 0,
+        }
+        for id, current in currents.items():
+            talon_currents[id].set(current)
+
+        total = sum(currents.values()) + robotconstants.PowerConstants.BASE_CURRENT
+        self.battery_voltage = self.battery.update(total, tm_diff)
+        wpilib.simulation.RoboRioSim.setVInVoltage(self.battery_voltage)
+
+        brownout = self.battery_voltage < robotconstants.PowerConstants.BROWNOUT_VOLTAGE
+        if brownout and not self.in_brownout:
+            self.brownouts += 1
+        self.in_brownout = brownout
+
+        acceleration = (
+            abs(
+                self.drive.left.ground_acceleration
+                + self.drive.right.ground_acceleration
+            )
+            / 2
+        )
+        self.max_acceleration = max(self.max_acceleration, acceleration)
+
+        self.nt.putNumber("battery_voltage", self.battery_voltage)
+        self.nt.putNumber("battery_current", total)
+        self.nt.putNumber(
+            "battery_open_circuit_voltage", self.battery.open_circuit_voltage
+        )
+        self.nt.putNumber("brownouts", self.brownouts)
+        self.nt.putNumber("max_acceleration", self.max_acceleration)
+        self.nt.putBoolean(
+            "wheel_slip", self.drive.left.slipping or self.drive.right.slipping
+        )
+
     def update_sim(self, now: float, tm_diff: float) -> None:
         """
             Called when the simulation parameters for the program need to be
@@ -79,18 +188,51 @@ class PhysicsEngine:
                             time that this function was called
         """
 
-        self.wheel_velocity.left = self.getMotorSpeed(1) * chassis.Chassis.MAX_VELOCITY
-        self.wheel_velocity.right = self.getMotorSpeed(3) * chassis.Chassis.MAX_VELOCITY
+        dx, dy, dtheta = self.drive.update(
+            self.getDriveOutput(1),
+            self.getDriveOutput(3),
+            self.battery_voltage,
+            self.getSupplyLimit(self.robot.dm_r),
+            self.getSupplyLimit(self.robot.dm_l),
+            tm_diff,
+        )
+        self.updateBattery(tm_diff)
+        self.updateTurret(tm_diff)
 
-        self.wheel_position.left += self.wheel_velocity.left * tm_diff
-        self.wheel_position.right += self.wheel_velocity.right * tm_diff
+        self.wheel_velocity.left = self.drive.left.velocity
+        self.wheel_velocity.right = self.drive.right.velocity
+        self.wheel_position.left = self.drive.left.position
+        self.wheel_position.right = self.drive.right.position
 
         self.setMotorPosition(1, self.wheel_position.left)
         self.setMotorPosition(3, -self.wheel_position.right)
 
-        transform = self.drivetrain.calculate(
-            self.wheel_velocity.left, self.wheel_velocity.right, tm_diff
-        )
+        transform = Transform2d(Translation2d(dx, dy), Rotation2d(dtheta))
 
         pose = self.physics_controller.move_robot(transform)
+        if self.field is not None:
+            pose = self.resolveCollision(pose)
         PhysicsEngine.setSimulationPose(pose)
+
+    def resolveCollision(self, pose):
+        """Undo a move that drives the robot footprint into a wall or field element."""
+        x = pose.translation().x
+        y = pose.translation().y
+        contact = self.footprint.collides(
+            self.field, x, y, pose.rotation().radians()
+        )
+        if contact and self.prev_pose is not None:
+            # allow moves that back out of an obstacle, block the rest
+            prev = self.prev_pose.translation()
+            if self.field.distance(x, y) <= self.field.distance(prev.x, prev.y):
+                pose = self.physics_controller.move_robot(
+                    Transform2d(pose, self.prev_pose)
+                )
+        if contact and not self.in_contact:
+            self.contacts += 1
+        self.in_contact = contact
+        self.prev_pose = pose
+
+        self.nt.putBoolean("in_contact", self.in_contact)
+        self.nt.putNumber("contacts", self.contacts)
+        return pose
@@ -6,7 +6,12 @@ import wpilib
 from magicbot import MagicRobot
 from utils import units
 from components.chassis import Chassis
-from utils import lazypigeonimu, lazytalonfx
+from components.loadshedder import LoadShedder
+from components.pathrecorder import PathRecorder
+from components.powermanager import PowerManager
+from components.turret import Turret
+from components.vision import Vision
+from utils import batterymonitor, gcmanager, lazypigeonimu, lazytalonfx, telemetry
 
 
 class Robot(MagicRobot):
@@ -16,9 +21,19 @@ class Robot(MagicRobot):
     DS_L_ID = 2
     DM_L_ID = 3
 
+    TURRET_ID = 4
     ACTUATOR_ID = 5
 
+    # publish per-loop allocation counts, slows the loop down
+    TRACE_ALLOCATIONS = False
+
     chassis: Chassis
+    turret: Turret
+    power_manager: PowerManager
+    path_recorder: PathRecorder
+    vision: Vision
+    # must stay last, it runs deferred work with whatever time is left
+    load_shedder: LoadShedder
 
     def createObjects(self):
         """Initialize all wpilib motors & sensors"""
@@ -31,14 +46,56 @@ class Robot(MagicRobot):
         self.dm_l.follow(self.ds_l)
         self.dm_r.follow(self.ds_r)
 
+        self.turret_motor = lazytalonfx.LazyTalonFX(self.TURRET_ID)
+
         self.actuator = ctre.WPI_TalonSRX(self.ACTUATOR_ID)
 
         self.imu = lazypigeonimu.LazyPigeonIMU(self.actuator)
+        self.imu.configure()
+
+        self.battery = batterymonitor.BatteryMonitor()
 
         self.driver = wpilib.XboxController(0)
 
+        self.gc_manager = gcmanager.GCManager(self.TRACE_ALLOCATIONS)
+
+    def robotInit(self):
+        super().robotInit()
+        telemetry.log.start()
+        self.gc_manager.freeze()
+        self.startLoop()
+
+    def autonomousInit(self):
+        self.gc_manager.onEnable()
+
+    def teleopInit(self):
+        self.gc_manager.onEnable()
+
+    def disabledInit(self):
+        self.gc_manager.onDisable()
+
+    def endCompetition(self):
+        # keep the odometry thread from outliving the robot, e.g. between sim tests
+        self.chassis.shutdown()
+        telemetry.log.stop()
+        super().endCompetition()
+
     def robotPeriodic(self):
-        pass
+        # magicbot calls this last in every loop of every mode, it is the only
+        # hook that also runs in autonomous, so it sets up the next loop
+        self.gc_manager.update()
+        self.load_shedder.markLoopEnd()
+        self.startLoop()
+
+    def startLoop(self):
+        """Sample the sensors for the next loop, before anything else runs."""
+        self.gc_manager.markLoopStart()
+        self.imu.refresh()
+        self.battery.refresh()
+
+    def disabledPeriodic(self):
+        # the load shedder only runs while enabled, and disabled has time
+        telemetry.log.requestFlush()
 
     def teleopPeriodic(self):
         try:
@@ -49,6 +106,12 @@ class Robot(MagicRobot):
             rotation = 0 if abs(rotation) <= 0.3 else rotation / 3
 
             self.chassis.setTankDrive(1.0, rotation)
+
+            # teach a path for autonomous/replaypath.py
+            if self.driver.getStartButtonPressed():
+                self.path_recorder.start()
+            elif self.driver.getBackButtonPressed():
+                self.path_recorder.stop()
         except:
             self.onException()
 
@@ -0,0 +1,35 @@
+class BatterySim:
+    """A lead acid battery that sags under load and as it discharges.
+
+    The open circuit voltage falls linearly with the charge drawn, from
+    FULL_VOLTAGE to EMPTY_VOLTAGE over CAPACITY, and the terminal voltage is
+    that minus the drop across the internal resistance.
+    """
+
+    CAPACITY = 18 * 3600  # coulombs, 18 Ah
+    FULL_VOLTAGE = 12.7
+    EMPTY_VOLTAGE = 11.7
+    RESISTANCE = 0.02  # ohms
+
+    def __init__(self, voltage=FULL_VOLTAGE, resistance=RESISTANCE, capacity=CAPACITY):
+        """voltage is the open circuit voltage to start from."""
+        self.resistance = resistance
+        self.capacity = capacity
+        self.open_circuit_voltage = voltage
+        self.charge = (
+            capacity
+            * (voltage - self.EMPTY_VOLTAGE)
+            / (self.FULL_VOLTAGE - self.EMPTY_VOLTAGE)
+        )
+        self.voltage = voltage
+        self.current = 0
+
+    def update(self, current, dt):
+        """Draw current for dt and return the terminal voltage."""
+        self.current = current
+        self.charge = max(self.charge - current * dt, 0)
+        self.open_circuit_voltage = self.EMPTY_VOLTAGE + (
+            self.FULL_VOLTAGE - self.EMPTY_VOLTAGE
+        ) * (self.charge / self.capacity)
+        self.voltage = max(self.open_circuit_voltage - current * self.resistance, 0)
+        return self.voltage
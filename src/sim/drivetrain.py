@@ -0,0 +1,154 @@
+import math
+
+
+class SideSim:
+    """One side of a differential drivetrain driven by a voltage model.
+
+    The side follows V = KS * sign(v) + KV * v + KA * a. The current drawn by
+    each motor is what it takes to produce the acceleration plus the free
+    current, and a supply current limit caps that the way a Talon would.
+
+    With a friction coefficient the tread can only push the ground so hard.
+    Past that the wheels break loose: they spin up against kinetic friction
+    while the chassis only gets the friction force, until the wheel speed
+    comes back to the ground speed.
+    """
+
+    # falcon 500
+    STALL_TORQUE = 4.69  # N m
+    STALL_CURRENT = 257  # A
+    FREE_CURRENT = 1.5  # A
+    KT = STALL_TORQUE / STALL_CURRENT
+
+    GRAVITY = 9.81  # m/s^2
+    KINETIC_FRACTION = 0.8  # kinetic over static friction
+    # wheels, gears and rotors as a share of the mass they push
+    ROTATING_FRACTION = 0.05
+
+    def __init__(
+        self, ks, kv, ka, mass, wheel_radius, gear_ratio, motors, friction=None
+    ):
+        self.ks = ks
+        self.kv = kv
+        self.ka = ka
+        self.mass = mass
+        self.motors = motors
+        # newtons at the wheel per amp through every motor on this side
+        self.force_per_amp = self.KT * gear_ratio * motors / wheel_radius
+        # max acceleration the tread can give the chassis
+        self.traction = None if friction is None else friction * self.GRAVITY
+
+        # position and velocity are the wheel's, as the encoder sees them
+        self.position = 0
+        self.velocity = 0
+        self.acceleration = 0
+        self.ground_velocity = 0
+        self.ground_acceleration = 0
+        self.slipping = False
+        self.supply_current = 0
+        self.stator_current = 0
+
+    def update(self, output, battery_voltage, supply_limit, dt):
+        voltage = output * battery_voltage
+        # static friction opposes the voltage until the wheel turns
+        friction = math.copysign(self.ks, self.velocity or voltage)
+        if not self.velocity and abs(voltage) <= self.ks:
+            # static friction holds the robot still
+            acceleration = 0
+        else:
+            acceleration = (voltage - friction - self.kv * self.velocity) / self.ka
+
+        stator = abs(acceleration) * self.mass / self.force_per_amp + self.FREE_CURRENT
+        if supply_limit is not None and abs(output) > 1e-3:
+            # supply current is stator current scaled by the duty cycle
+            max_stator = supply_limit / abs(output)
+            if stator > max_stator:
+                acceleration *= (max_stator - self.FREE_CURRENT) / (
+                    stator - self.FREE_CURRENT
+                )
+                stator = max_stator
+
+        if self.traction is not None and abs(acceleration) > self.traction:
+            self.slipping = True
+        if self.slipping:
+            # kinetic friction drags the chassis along and brakes the wheel
+            slip = self.velocity - self.ground_velocity
+            direction = math.copysign(1, slip if slip else acceleration)
+            ground_acceleration = direction * self.KINETIC_FRACTION * self.traction
+            wheel_acceleration = (
+                acceleration - ground_acceleration
+            ) / self.ROTATING_FRACTION
+        else:
+            ground_acceleration = wheel_acceleration = acceleration
+
+        prev_velocity = self.velocity
+        prev_slip = self.velocity - self.ground_velocity
+        self.velocity += wheel_acceleration * dt
+        if prev_velocity and (prev_velocity > 0) != (self.velocity > 0):
+            # friction stops the wheel, it does not reverse it
+            if abs(voltage) <= self.ks:
+                self.velocity = 0
+        self.ground_velocity += ground_acceleration * dt
+        if self.slipping and prev_slip * (self.velocity - self.ground_velocity) < 0:
+            # the wheel caught up with the ground, it grips again
+            self.slipping = False
+            self.velocity = self.ground_velocity
+        elif not self.slipping:
+            self.ground_velocity = self.velocity
+
+        self.position += (prev_velocity + self.velocity) / 2 * dt
+        self.acceleration = wheel_acceleration
+        self.ground_acceleration = ground_acceleration
+        self.stator_current = stator
+        self.supply_current = stator * abs(output)
+
+
+class DrivetrainSim:
+    """A differential drivetrain with battery voltage and current limits."""
+
+    def __init__(
+        self,
+        left,
+        right,
+        mass,
+        track_width,
+        wheel_radius,
+        gear_ratio,
+        motors=2,
+        friction=None,
+    ):
+        """left and right are the (ks, kv, ka) of each side.
+
+        friction is the coefficient between tread and carpet, None never slips.
+        """
+        self.track_width = track_width
+        # each side pushes half the robot
+        self.left = SideSim(
+            *left, mass / 2, wheel_radius, gear_ratio, motors, friction
+        )
+        self.right = SideSim(
+            *right, mass / 2, wheel_radius, gear_ratio, motors, friction
+        )
+
+    def update(
+        self, output_l, output_r, battery_voltage, limit_l=None, limit_r=None, dt=0.02
+    ):
+        """Step both sides and return the robot-relative (dx, dy, dtheta)."""
+        self.left.update(output_l, battery_voltage, limit_l, dt)
+        self.right.update(output_r, battery_voltage, limit_r, dt)
+
+        left = self.left.ground_velocity
+        right = self.right.ground_velocity
+        distance = (left + right) / 2 * dt
+        dtheta = (right - left) / self.track_width * dt
+        # constant curvature over the step
+        half = dtheta / 2
+        chord = distance * math.sin(half) / half if abs(half) > 1e-9 else distance
+        return chord * math.cos(half), chord * math.sin(half), dtheta
+
+    def getSupplyCurrent(self):
+        """Total supply current drawn by every drive motor."""
+        return (
+            self.left.supply_current * self.left.motors
+            + self.right.supply_current * self.right.motors
+        )
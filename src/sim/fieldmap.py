@@ -0,0 +1,256 @@
+import hashlib
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from utils import units
+
+# binary mask, white is free and black is occupied, see tools/fieldmask.py
+FIELD_IMAGE = Path(__file__).resolve().parents[2] / "field" / "infiniterecharge.png"
+
+
+def decodePNG(data: bytes) -> np.ndarray:
+    """Decode an 8-bit, non-interlaced PNG into an (h, w, channels) array."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a png image")
+    offset = 8
+    idat = b""
+    palette = None
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        body = data[offset + 8 : offset + 8 + length]
+        offset += length + 12
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(
+                ">IIBBBBB", body
+            )
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"IDAT":
+            idat += body
+        elif kind == b"IEND":
+            break
+
+    if depth != 8 or interlace != 0:
+        raise ValueError("only 8-bit non-interlaced png images are supported")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color]
+    stride = width * channels
+
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8)
+    raw = raw.reshape(height, stride + 1)
+    pixels = np.zeros((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.int32)
+    for y in range(height):
+        method = raw[y, 0]
+        line = raw[y, 1:].astype(np.int32)
+        if method == 0:
+            out = line
+        elif method == 2:
+            out = (line + prev) & 0xFF
+        else:
+            # sub, average and paeth depend on the already decoded left pixel
+            out = np.zeros(stride, dtype=np.int32)
+            for i in range(stride):
+                left = out[i - channels] if i >= channels else 0
+                up = prev[i]
+                if method == 1:
+                    pred = left
+                elif method == 3:
+                    pred = (left + up) >> 1
+                else:
+                    up_left = prev[i - channels] if i >= channels else 0
+                    p = left + up - up_left
+                    pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+                    if pa <= pb and pa <= pc:
+                        pred = left
+                    elif pb <= pc:
+                        pred = up
+                    else:
+                        pred = up_left
+                out[i] = (line[i] + pred) & 0xFF
+        pixels[y] = out
+        prev = out
+
+    image = pixels.reshape(height, width, channels)
+    if color == 3:
+        image = palette[image[:, :, 0]]
+    return image
+
+
+def encodePNG(image: np.ndarray) -> bytes:
+    """Encode an (h, w) uint8 array as an 8-bit grayscale PNG."""
+    height, width = image.shape
+
+    def chunk(kind, body):
+        return (
+            struct.pack(">I", len(body))
+            + kind
+            + body
+            + struct.pack(">I", zlib.crc32(kind + body))
+        )
+
+    # filter method 0 on every row
+    raw = np.hstack((np.zeros((height, 1), dtype=np.uint8), image)).tobytes()
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def occupancyFromImage(image: np.ndarray, tolerance: int = 24) -> np.ndarray:
+    """Mark every pixel that is not the dominant (carpet) color as occupied."""
+    channels = min(image.shape[2], 3)
+    rgb = image[:, :, :channels].reshape(-1, channels)
+    colors, counts = np.unique(rgb, axis=0, return_counts=True)
+    carpet = colors[np.argmax(counts)].astype(np.int32)
+    diff = np.abs(image[:, :, :channels].astype(np.int32) - carpet)
+    return np.max(diff, axis=2) > tolerance
+
+
+def _distanceToMask(mask: np.ndarray, sx: float, sy: float) -> np.ndarray:
+    """Exact euclidean distance from every cell to the nearest set cell of mask."""
+    height, width = mask.shape
+    if not mask.any():
+        return np.full(mask.shape, np.inf)
+
+    # distance along each row to the nearest set cell
+    cols = np.arange(width)
+    left = np.where(mask, cols, -np.inf)
+    left = np.maximum.accumulate(left, axis=1)
+    right = np.where(mask, cols, np.inf)
+    right = np.minimum.accumulate(right[:, ::-1], axis=1)[:, ::-1]
+    row_dist = np.minimum(cols - left, right - cols) * sx
+    row_dist_sq = row_dist ** 2
+
+    # combine rows: d(y, x)^2 = min_y' row_dist(y', x)^2 + ((y - y') * sy)^2
+    rows = np.arange(height) * sy
+    dist_sq = np.empty(mask.shape)
+    for y in range(height):
+        offset = (rows - rows[y])[:, None] ** 2
+        dist_sq[y] = np.min(row_dist_sq + offset, axis=0)
+    return np.sqrt(dist_sq)
+
+
+def signedDistance(occupancy: np.ndarray, sx: float, sy: float) -> np.ndarray:
+    """Signed distance field, positive in free space and negative in obstacles."""
+    outside = _distanceToMask(occupancy, sx, sy)
+    inside = _distanceToMask(~occupancy, sx, sy)
+    return np.where(occupancy, -inside, outside)
+
+
+class FieldMap:
+    """An occupancy grid and signed distance field rasterized from a field image.
+
+    The rasterized grid is cached next to the image as a memory-mapped .npy
+    file keyed by the image hash, so it is only rebuilt when the image changes.
+    """
+
+    # 2021 field dimensions
+    FIELD_LENGTH = 52.4375 * units.feet
+    FIELD_WIDTH = 26.9375 * units.feet
+
+    # a field is mostly carpet, anything more occupied is not an occupancy map
+    MAX_OCCUPIED_FRACTION = 0.25
+
+    def __init__(
+        self,
+        image_path: Path = FIELD_IMAGE,
+        length: float = FIELD_LENGTH,
+        width: float = FIELD_WIDTH,
+    ):
+        self.image_path = Path(image_path)
+        self.length = length
+        self.width = width
+
+        grid = self._loadGrid()
+        self.occupancy = grid[0]
+        self.sdf = grid[1]
+        self.rows, self.cols = self.sdf.shape
+        self.meters_per_col = self.length / self.cols
+        self.meters_per_row = self.width / self.rows
+
+    def _cachePath(self, digest: str) -> Path:
+        cache_dir = self.image_path.parent / ".cache"
+        return cache_dir / f"{self.image_path.stem}-{digest}.npy"
+
+    def _loadGrid(self) -> np.ndarray:
+        data = self.image_path.read_bytes()
+        digest = hashlib.sha1(
+            data + struct.pack(">dd", self.length, self.width)
+        ).hexdigest()[:16]
+        cache = self._cachePath(digest)
+        if not cache.exists():
+            cache.parent.mkdir(exist_ok=True)
+            for stale in cache.parent.glob(f"{self.image_path.stem}-*.npy"):
+                stale.unlink()
+            self._buildGrid(data, cache)
+        grid = np.load(cache, mmap_mode="r")
+        self._checkOccupancy(grid[0])
+        return grid
+
+    def _checkOccupancy(self, occupancy: np.ndarray) -> None:
+        fraction = float(np.mean(occupancy))
+        if fraction > self.MAX_OCCUPIED_FRACTION:
+            raise ValueError(
+                f"{self.image_path.name} is {fraction:.0%} occupied,"
+                " it does not look like a field occupancy map"
+            )
+
+    def _buildGrid(self, data: bytes, cache: Path) -> None:
+        image = decodePNG(data)
+        occupancy = occupancyFromImage(image)
+        self._checkOccupancy(occupancy)
+        rows, cols = occupancy.shape
+        sdf = signedDistance(occupancy, self.length / cols, self.width / rows)
+        grid = np.stack((occupancy.astype(np.float32), sdf.astype(np.float32)))
+        tmp = cache.with_suffix(".tmp.npy")
+        np.save(tmp, grid)
+        tmp.replace(cache)
+
+    def distance(self, x: float, y: float) -> float:
+        """Signed distance (m) from a field point to the nearest obstacle."""
+        col = int(x // self.meters_per_col)
+        row = int((self.width - y) // self.meters_per_row)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return float(self.sdf[row, col])
+        # everything outside the field is a wall
+        return -max(-x, x - self.length, y - self.width, -y, 0)
+
+    def isOccupied(self, x: float, y: float) -> bool:
+        return self.distance(x, y) <= 0
+
+
+class Footprint:
+    """A rectangular robot footprint checked against a FieldMap in constant time."""
+
+    def __init__(self, length: float, width: float):
+        self.inscribed_radius = min(length, width) / 2
+        half_l = length / 2
+        half_w = width / 2
+        # corners and edge midpoints in the robot frame
+        self.points = (
+            (half_l, half_w),
+            (half_l, -half_w),
+            (-half_l, half_w),
+            (-half_l, -half_w),
+            (half_l, 0),
+            (-half_l, 0),
+            (0, half_w),
+            (0, -half_w),
+        )
+
+    def collides(self, field: FieldMap, x: float, y: float, heading: float) -> bool:
+        """Does the footprint at a field pose touch an obstacle."""
+        if field.distance(x, y) < self.inscribed_radius:
+            return True
+        cos = np.cos(heading)
+        sin = np.sin(heading)
+        for px, py in self.points:
+            if field.distance(x + px * cos - py * sin, y + px * sin + py * cos) <= 0:
+                return True
+        return False
@@ -1,14 +1,14 @@
 import numpy as np
 import wpilib
-from magicbot.state_machine import StateMachine, state
+from magicbot.state_machine import state
 from networktables import NetworkTables
 
-from components import chassis, flywheel, turret, vision
+from components import chassis, flywheel, loadshedder, turret, vision
 from controls import pidf
-from utils import drivesignal, lazypigeonimu, units
+from utils import drivesignal, lazypigeonimu, statetrace, units
 
 
-class AlignChassis(StateMachine):
+class AlignChassis(statetrace.TracedStateMachine):
 
     # target tracking pidf gains
     DISTANCE_KP = 4.5
@@ -29,11 +29,14 @@ class AlignChassis(StateMachine):
 
     SEARCH_SPEED = 0.3
 
+    GOAL_STATE = "lockAtTarget"
+
     chassis: chassis.Chassis
     turret: turret.Turret
     vision: vision.Vision
     imu: lazypigeonimu.LazyPigeonIMU
     flywheel: flywheel.Flywheel
+    load_shedder: loadshedder.LoadShedder
 
     def __init__(self):
         self.desired_velocity = drivesignal.DriveSignal()
@@ -67,6 +70,11 @@ class AlignChassis(StateMachine):
         )
 
         self.nt = NetworkTables.getTable("/components/alignchassis")
+        self.load_shedder.register(
+            "alignchassis",
+            loadshedder.Priority.NetworkTables,
+            self.updateNetworkTables,
+        )
 
     def align(self):
         """Enable the statemachine."""
@@ -149,6 +157,5 @@ class AlignChassis(StateMachine):
 
     def execute(self):
         super().execute()
-        self.updateNetworkTables()
         if self.is_executing:
             self.vision.enableLED(True)
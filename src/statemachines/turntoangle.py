@@ -1,32 +1,67 @@
-from magicbot.state_machine import StateMachine, state
-from components import chassis
-import numpy as np
-from utils import units
+import wpilib
+from magicbot.state_machine import state
+from networktables import NetworkTables
+from components import chassis, loadshedder
+from controls import profiledturn
+from utils import lazypigeonimu, robotconstants, statetrace, units
 
 
-class TurnToAngle(StateMachine):
+class TurnToAngle(robotconstants.TurnToAngleConstants, statetrace.TracedStateMachine):
 
     chassis: chassis.Chassis
+    imu: lazypigeonimu.LazyPigeonIMU
+    load_shedder: loadshedder.LoadShedder
 
-    KP = 0.25
-    TOLERANCE = 5 * units.degrees
+    GOAL_STATE = "lockInPlace"
 
     def __init__(self):
         self.desired_angle = 90 * units.degrees
+        self.profiled = True
+
+        self.start_time = 0
+        self.start_heading = 0
+        self.settle_time = 0
 
     def setup(self):
-        pass
+        self.turn = profiledturn.ProfiledTurn(
+            self.chassis.KS,
+            self.chassis.KV,
+            self.chassis.KA,
+            self.chassis.TRACK_RADIUS,
+            self.PROFILE_VOLTAGE,
+            self.CRUISE_FRACTION,
+            self.PROFILE_KP,
+        )
+        self.nt = NetworkTables.getTable("/components/turntoangle")
+        self.load_shedder.register(
+            "turntoangle",
+            loadshedder.Priority.NetworkTables,
+            self.updateNetworkTables,
+        )
 
     def align(self):
+        # time the turn from when it was asked for, not each retry
+        if not self.is_executing:
+            self.start_time = wpilib.Timer.getFPGATimestamp()
         self.engage()
 
+    def setProfiled(self, profiled: bool) -> None:
+        self.profiled = profiled
+
     def isAligned(self):
-        heading = self.chassis.getHeading()
+        heading = self.imu.getHeading()
         return abs(units.angle_diff(heading, self.desired_angle)) <= self.TOLERANCE
 
+    def getSettleTime(self) -> float:
+        """Time taken by the last turn to settle within tolerance."""
+        return self.settle_time
+
     @state(first=True)
-    def turnToAngle(self, initial_call):
-        heading = self.chassis.getHeading()
+    def turnToAngle(self):
+        if self.profiled:
+            self.next_state_now("followProfile")
+            return
+        heading = self.imu.getHeading()
         error = units.angle_diff(
             heading, self.desired_angle
         )  # number between [-pi, pi]
@@ -35,12 +70,35 @@ class TurnToAngle(StateMachine):
         if self.isAligned():
             self.next_state("lockInPlace")
 
+    @state()
+    def followProfile(self, initial_call, state_tm):
+        heading = self.imu.getContinuousHeading()
+        if initial_call:
+            self.start_heading = heading
+            self.turn.plan(
+                heading, heading + units.angle_diff(self.desired_angle, heading)
+            )
+
+        # drive the wheels in opposite directions
+        output = self.chassis.voltsToOutput(self.turn.update(state_tm, heading, 0.02))
+        self.chassis.setOutput(output, -output)
+
+        if self.turn.isFinished(state_tm) and self.isAligned():
+            self.next_state("lockInPlace")
+
     @state()
     def lockInPlace(self, initial_call):
+        if initial_call:
+            self.settle_time = wpilib.Timer.getFPGATimestamp() - self.start_time
         self.chassis.stop()
         if not self.isAligned():
             self.next_state("turnToAngle")
 
+    def updateNetworkTables(self):
+        self.nt.putNumber("reference", self.turn.reference)
+        self.nt.putNumber("reference_velocity", self.turn.reference_velocity)
+        self.nt.putNumber("settle_time", self.settle_time)
+
     def done(self):
         super().done()
-        self.chassis.stop()
\ No newline at end of file
+        self.chassis.stop()
@@ -0,0 +1,55 @@
+"""
+    Check the arc odometry against closed form poses for straight driving,
+    constant curvature arcs, gyro wraparound and slip weighting.
+"""
+import math
+
+import pytest
+
+from controls import arcodometry
+
+
+def test_straight():
+    odometry = arcodometry.ArcOdometry()
+    odometry.reset(1, 2, math.pi / 2, 5, 5, 0)
+    odometry.update(6, 6, 0)
+    assert (odometry.x, odometry.y, odometry.heading) == pytest.approx(
+        (1, 3, math.pi / 2)
+    )
+
+
+@pytest.mark.parametrize("steps", [1, 10, 100])
+def test_arc_is_exact_for_any_step(steps):
+    # a quarter circle of radius 2, the answer does not depend on the step count
+    radius = 2
+    odometry = arcodometry.ArcOdometry()
+    for i in range(1, steps + 1):
+        heading = math.pi / 2 * i / steps
+        distance = radius * heading
+        odometry.update(distance, distance, heading)
+    assert (odometry.x, odometry.y, odometry.heading) == pytest.approx(
+        (radius, radius, math.pi / 2)
+    )
+
+
+def test_turn_in_place():
+    odometry = arcodometry.ArcOdometry()
+    odometry.update(-0.5, 0.5, 1)
+    assert (odometry.x, odometry.y, odometry.heading) == pytest.approx((0, 0, 1))
+
+
+def test_gyro_wraparound():
+    odometry = arcodometry.ArcOdometry()
+    odometry.reset(0, 0, 0, 0, 0, math.pi - 0.05)
+    # the gyro wraps from just under pi to just over -pi
+    odometry.update(0, 0, -math.pi + 0.05)
+    assert odometry.heading == pytest.approx(0.1)
+
+
+def test_weight_blends_estimate():
+    odometry = arcodometry.ArcOdometry()
+    # the wheels spun 1 m but the robot only moved the estimated 0.2 m
+    odometry.update(1, 1, 0, weight=0, estimate=0.2)
+    assert odometry.x == pytest.approx(0.2)
+    odometry.update(2, 2, 0, weight=0.5, estimate=0.2)
+    assert odometry.x == pytest.approx(0.8)
@@ -0,0 +1,57 @@
+"""
+    Check the simulated battery sags under load and drains, and that the power
+    budget keeps the battery at its minimum voltage.
+"""
+import pytest
+
+from controls import powerbudget
+from sim import battery
+from utils import robotconstants
+
+Power = robotconstants.PowerConstants
+
+
+def test_sag_and_drain():
+    cell = battery.BatterySim(12.2)
+    assert cell.update(0, 0.02) == pytest.approx(12.2)
+    sagged = 12.2 - 100 * cell.RESISTANCE
+    assert cell.update(100, 0.02) == pytest.approx(sagged, abs=1e-3)
+
+    # draining a tenth of the capacity drops a tenth of the full range
+    cell = battery.BatterySim()
+    cell.update(cell.CAPACITY / 10, 1)
+    drop = (cell.FULL_VOLTAGE - cell.EMPTY_VOLTAGE) / 10
+    assert cell.open_circuit_voltage == pytest.approx(cell.FULL_VOLTAGE - drop)
+
+    # an empty battery stays empty
+    cell = battery.BatterySim(cell.EMPTY_VOLTAGE)
+    cell.update(10, 1)
+    assert cell.open_circuit_voltage == pytest.approx(cell.EMPTY_VOLTAGE)
+
+
+def test_budget_holds_min_voltage():
+    cell = battery.BatterySim(12.5, resistance=0.03)
+    model = powerbudget.BatteryModel(Power.MODEL_VOLTAGE, Power.MODEL_RESISTANCE)
+    # step the load so the model can see the resistance
+    for i in range(1000):
+        current = 20 if i % 20 < 10 else 100
+        model.update(cell.update(current, 0.02), current)
+    assert model.resistance == pytest.approx(0.03, rel=0.1)
+
+    budget = model.getBudget(Power.MIN_VOLTAGE)
+    assert cell.update(budget, 0.02) == pytest.approx(Power.MIN_VOLTAGE, abs=0.1)
+
+
+def test_allocate_by_priority():
+    chassis = powerbudget.Consumer("chassis", (0, 1, 2, 3), 0, 15, 60)
+    turret = powerbudget.Consumer("turret", (4,), 1, 5, 40)
+    consumers = (chassis, turret)
+
+    limits = dict(powerbudget.allocate(consumers, 1000))
+    assert (limits[chassis], limits[turret]) == (60, 40)
+    # the chassis gets the spare current first
+    limits = dict(powerbudget.allocate(consumers, 4 * 15 + 5 + 100))
+    assert (limits[chassis], limits[turret]) == (40, 5)
+    # never below the minimum, even past the budget
+    limits = dict(powerbudget.allocate(consumers, 0))
+    assert (limits[chassis], limits[turret]) == (15, 5)
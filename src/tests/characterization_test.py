@@ -0,0 +1,49 @@
+"""
+    Run the drivetrain characterization end to end in the simulator, with the
+    physics.py drivetrain built from constants/drivetrain.json, and check the
+    fit recovers those constants.
+"""
+import pytest
+
+pytest.importorskip("pyfrc")
+
+from networktables import NetworkTables  # noqa: E402
+
+from autonomous import characterizedrivetrain  # noqa: E402
+from utils import constants, robotconstants  # noqa: E402
+
+
+def test_characterize_drivetrain(control, monkeypatch):
+    expected = constants.load("drivetrain")
+    fitted = {}
+    # keep the fit out of the tree
+    monkeypatch.setattr(constants, "save", lambda name, values: fitted.update(values))
+    # the ramps drive further than the field is long
+    monkeypatch.setattr(robotconstants.SimConstants, "USE_COLLISIONS", False)
+
+    mode = characterizedrivetrain.CharacterizeDrivetrain
+    duration = (
+        2 * mode.QUASISTATIC_TIME
+        + 2 * mode.DYNAMIC_TIME
+        + mode.TURN_TIME
+        + len(mode.TESTS) * mode.REST_TIME
+    )
+    selector = NetworkTables.getTable("SmartDashboard/Autonomous Mode")
+
+    def on_step(tm):
+        # select the mode while disabled, autonomousInit reads it
+        if tm < 0.5:
+            selector.putString("selected", mode.MODE_NAME)
+            control.set_autonomous(enabled=False)
+        else:
+            control.set_autonomous(enabled=True)
+        return tm < duration + 1
+
+    control.run_test(on_step)
+
+    assert fitted, "characterization did not finish"
+    for side in ("left", "right"):
+        assert fitted[f"kv_{side}"] == pytest.approx(expected[f"kv_{side}"], rel=0.05)
+        assert fitted[f"ks_{side}"] == pytest.approx(expected[f"ks_{side}"], rel=0.2)
+        assert fitted[f"ka_{side}"] == pytest.approx(expected[f"ka_{side}"], rel=0.2)
+    assert fitted["track_width"] == pytest.approx(expected["track_width"], rel=0.05)
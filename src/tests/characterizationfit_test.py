@@ -0,0 +1,75 @@
+"""
+    Check the characterization fit recovers known constants from synthetic
+    voltage ramps, without the simulator.
+"""
+import numpy as np
+import pytest
+
+from controls import characterization
+
+KS = 0.6
+KV = 2.4
+KA = 0.3
+DT = 0.005
+
+
+def simulate(voltage, test):
+    """Position of a side following V = KS * sign(v) + KV * v + KA * a."""
+    position = np.zeros_like(voltage)
+    velocity = 0
+    for i in range(1, len(voltage)):
+        if test[i] != test[i - 1]:
+            velocity = 0
+        static = np.sign(velocity or voltage[i])
+        acceleration = (voltage[i] - KS * static - KV * velocity) / KA
+        velocity += acceleration * DT
+        position[i] = position[i - 1] + velocity * DT
+    return position
+
+
+def test_fit_feedforward():
+    # a quasistatic ramp each way and a dynamic step each way
+    ramp = np.arange(0, 6, DT)
+    step = np.arange(0, 1.5, DT)
+    voltage = np.concatenate(
+        (1 + 0.5 * ramp, -1 - 0.5 * ramp, np.full_like(step, 7), np.full_like(step, -7))
+    )
+    test = np.repeat(np.arange(4), (len(ramp), len(ramp), len(step), len(step)))
+    time = np.arange(len(voltage)) * DT
+    position = simulate(voltage, test)
+
+    ks, kv, ka = characterization.fitFeedforward(time, test, voltage, position)
+    assert ks == pytest.approx(KS, rel=0.05)
+    assert kv == pytest.approx(KV, rel=0.02)
+    assert ka == pytest.approx(KA, rel=0.1)
+
+
+def test_differentiate_does_not_cross_tests():
+    time = np.arange(6) * 0.1
+    position = np.array([0, 1, 2, 10, 10, 10], dtype=float)
+    test = np.array([0, 0, 0, 1, 1, 1])
+    velocity, acceleration = characterization.differentiate(time, position, test)
+    np.testing.assert_allclose(velocity, [10, 10, 10, 0, 0, 0])
+    np.testing.assert_allclose(acceleration, 0, atol=1e-9)
+
+
+def test_fit_track_width():
+    track_width = 0.7
+    heading = np.linspace(0, 2 * np.pi, 50)
+    left = -heading * track_width / 2
+    right = heading * track_width / 2
+    assert characterization.fitTrackWidth(left, right, heading) == pytest.approx(
+        track_width
+    )
+
+
+def test_fit_track_width_wrapped_heading():
+    track_width = 0.7
+    heading = np.linspace(0, 3 * np.pi, 50)
+    left = -heading * track_width / 2
+    right = heading * track_width / 2
+    # the chassis heading wraps around at pi
+    wrapped = np.remainder(heading + np.pi, 2 * np.pi) - np.pi
+    assert characterization.fitTrackWidth(left, right, wrapped) == pytest.approx(
+        track_width
+    )
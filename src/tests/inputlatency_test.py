@@ -0,0 +1,24 @@
+"""
+    Run the joystick to wheel latency harness as a regression gate. It runs
+    in its own process, it drives the simulated HAL itself.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("hal")
+
+HARNESS = Path(__file__).resolve().parents[2] / "benchmarks" / "inputlatency.py"
+
+
+def test_latency_within_budget():
+    result = subprocess.run(
+        [sys.executable, str(HARNESS), "--trials", "50"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stdout
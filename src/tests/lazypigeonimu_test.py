@@ -0,0 +1,26 @@
+"""
+    Construct and configure the IMU the way the robot does on boot, and run
+    the robot through a disabled loop.
+"""
+import pytest
+
+pytest.importorskip("pyfrc")
+
+import ctre  # noqa: E402
+
+from utils import lazypigeonimu  # noqa: E402
+
+
+def test_configure(robot):
+    # the robot fixture brings up the simulated HAL
+    imu = lazypigeonimu.LazyPigeonIMU(ctre.WPI_TalonSRX(30))
+    imu.configure()
+    assert imu.calibrated
+    assert imu.getHeading() == 0
+
+
+def test_boot(control, fake_time, robot):
+    control.set_autonomous(enabled=False)
+    control.run_test(lambda tm: tm < 1)
+    assert int(fake_time.get()) == 1
+    assert robot.imu.calibrated
@@ -0,0 +1,28 @@
+"""
+    Check the feedforward voltage with planned and differenced acceleration.
+"""
+import pytest
+
+from controls import motorfeedforward
+
+KS = 0.6
+KV = 2.4
+KA = 0.3
+
+
+def test_planned_acceleration():
+    feedforward = motorfeedforward.MotorFeedforward(KS, KV, KA)
+    assert feedforward.calculate(2, 0.02, 3) == pytest.approx(KS + 2 * KV + 3 * KA)
+    assert feedforward.calculate(-2, 0.02, -3) == pytest.approx(-KS - 2 * KV - 3 * KA)
+    # no static friction to overcome while holding still
+    assert feedforward.calculate(0, 0.02, 0) == 0
+
+
+def test_differenced_acceleration():
+    feedforward = motorfeedforward.MotorFeedforward(KS, KV, KA)
+    feedforward.calculate(1, 0.02, 0)
+    # 0.1 m/s more than last loop is 5 m/s^2
+    assert feedforward.calculate(1.1, 0.02) == pytest.approx(KS + 1.1 * KV + 5 * KA)
+    assert feedforward.desired_acceleration == pytest.approx(5)
+    # a planned acceleration is used as is
+    assert feedforward.calculate(1.2, 0.02, 0) == pytest.approx(KS + 1.2 * KV)
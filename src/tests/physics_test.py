@@ -0,0 +1,26 @@
+"""
+    Drive the simulated robot into the field in teleop, with collisions on,
+    and check it is stopped by what it runs into.
+"""
+import pytest
+
+pytest.importorskip("pyfrc")
+
+import wpilib.simulation  # noqa: E402
+from networktables import NetworkTables  # noqa: E402
+
+from sim import fieldmap  # noqa: E402
+from utils import robotconstants  # noqa: E402
+
+
+def test_collisions(control):
+    assert robotconstants.SimConstants.USE_COLLISIONS
+
+    # teleop drives forward at full throttle
+    control.set_operator_control(enabled=True)
+    control.run_test(lambda tm: tm < 10)
+
+    assert NetworkTables.getTable("/physics").getNumber("contacts", 0) >= 1
+    field = wpilib.simulation.SimDeviceSim("Field2D")
+    assert 0 < field.getDouble("x").get() < fieldmap.FieldMap.FIELD_LENGTH
+    assert 0 < field.getDouble("y").get() < fieldmap.FieldMap.FIELD_WIDTH
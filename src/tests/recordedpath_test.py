@@ -0,0 +1,61 @@
+"""
+    Check the path simplification keeps corners and pauses within tolerance,
+    and that a compressed path replays the taught motion.
+"""
+import numpy as np
+import pytest
+
+from controls import recordedpath
+
+TOLERANCE = 0.02
+
+
+def test_simplify_line():
+    points = np.column_stack((np.linspace(0, 3, 50), np.linspace(0, 1, 50)))
+    np.testing.assert_array_equal(recordedpath.simplify(points, TOLERANCE), [0, 49])
+
+
+def test_simplify_keeps_corner():
+    leg = np.linspace(0, 2, 21)
+    zeros = np.zeros_like(leg)
+    points = np.concatenate(
+        (np.column_stack((leg, zeros)), np.column_stack((zeros + 2, leg))[1:])
+    )
+    np.testing.assert_array_equal(recordedpath.simplify(points, TOLERANCE), [0, 20, 40])
+
+
+def test_simplify_within_tolerance():
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 2 * np.pi, 500)
+    noise = rng.normal(0, 0.002, (len(t), 2))
+    points = np.column_stack((np.cos(t), np.sin(2 * t))) + noise
+    kept = recordedpath.simplify(points, TOLERANCE)
+    assert len(kept) < len(points) / 5
+    # every dropped point lies within tolerance of the segment it was dropped from
+    for start, end in zip(kept[:-1], kept[1:]):
+        segment = points[end] - points[start]
+        for point in points[start + 1 : end]:
+            offset = point - points[start]
+            along = np.clip(offset @ segment / (segment @ segment), 0, 1)
+            assert np.linalg.norm(offset - along * segment) <= TOLERANCE
+
+
+def test_compress_keeps_pause():
+    # drive 1 m in 1 s, wait 1 s, drive back in 1 s
+    time = np.arange(0, 3.001, 0.02)
+    x = np.interp(time, (0, 1, 2, 3), (0, 1, 1, 0))
+    log = {
+        "time": time + 100,
+        "x": x,
+        "y": np.zeros_like(time),
+        "heading": np.zeros_like(time),
+    }
+    path = recordedpath.compress(
+        log, TOLERANCE, time_scale=1, turn_scale=0.3, max_velocity=4
+    )
+    assert len(path) == 4
+    assert path.total_time == pytest.approx(3)
+    assert path.sample(0.5)[0] == pytest.approx(0.5)
+    assert path.sample(1.5) == pytest.approx((1, 0, 0, 0, 0))
+    # backwards over the last segment, the robot faces +x
+    assert path.sample(2.5)[3] == pytest.approx(-1)
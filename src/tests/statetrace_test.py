@@ -0,0 +1,50 @@
+"""
+    Check the state trace metrics cover one engagement at a time and count
+    flaps between active states.
+"""
+import pytest
+
+pytest.importorskip("magicbot")
+
+from utils import statetrace  # noqa: E402
+from utils.statetrace import IDLE  # noqa: E402
+
+
+def engage(trace, start):
+    trace.update("driveToTarget", start)
+    trace.update("lockAtTarget", start + 1)
+    trace.update("driveToTarget", start + 1.2)
+    trace.update("lockAtTarget", start + 1.3)
+    trace.update(IDLE, start + 2)
+
+
+def test_engagement_metrics():
+    trace = statetrace.StateTrace("Test", "lockAtTarget")
+    assert not trace.update(IDLE, 0)
+    engage(trace, 5)
+
+    assert trace.time_to_goal == pytest.approx(1)
+    assert trace.time_in_state["driveToTarget"] == pytest.approx(1.1)
+    assert trace.time_in_state["lockAtTarget"] == pytest.approx(0.9)
+    assert trace.entries["lockAtTarget"] == 2
+    # back to driveToTarget after 0.2 s and back to lockAtTarget after 0.1 s
+    assert trace.flaps == 2
+    # idle time before the engagement is not counted
+    assert trace.time_in_state[IDLE] == 0
+
+
+def test_metrics_reset_each_engagement():
+    trace = statetrace.StateTrace("Test", "lockAtTarget")
+    engage(trace, 0)
+    trace.update("driveToTarget", 10)
+    trace.update("lockAtTarget", 13)
+
+    assert trace.time_to_goal == pytest.approx(3)
+    assert trace.time_in_state["driveToTarget"] == pytest.approx(3)
+    assert trace.entries["lockAtTarget"] == 1
+    assert trace.flaps == 0
+    # the ring buffer keeps every transition
+    assert [state for _, state in trace.transitions()][-2:] == [
+        "driveToTarget",
+        "lockAtTarget",
+    ]
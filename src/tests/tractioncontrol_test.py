@@ -0,0 +1,91 @@
+"""
+    Check slip detection and the acceleration cap of traction control,
+    feeding it wheel and IMU motion directly.
+"""
+import math
+
+import pytest
+
+from controls import tractioncontrol
+
+DT = 0.02
+KS = 0.6
+KV = 2.4
+KA = 0.3
+# gentle enough that starting to accelerate is not mistaken for a runaway
+ACCELERATION = 1.5
+
+
+@pytest.fixture
+def traction():
+    return tractioncontrol.TractionControl(0.7, KS, KV, KA)
+
+
+def accelerate(traction, acceleration, loops, spin_left=0, velocity=0):
+    """Drive straight, the left wheels gaining spin_left m/s of slip per loop."""
+    slip = 0
+    for _ in range(loops):
+        velocity += acceleration * DT
+        slip += spin_left
+        traction.update(
+            velocity + slip,
+            velocity,
+            acceleration + spin_left / DT,
+            acceleration,
+            acceleration,
+            0,
+            DT,
+        )
+    return velocity
+
+
+def test_grip(traction):
+    velocity = accelerate(traction, ACCELERATION, 50)
+    assert not traction.isSlipping()
+    assert traction.getVelocity() == pytest.approx(velocity, abs=0.05)
+    assert traction.left.acceleration_limit == math.inf
+    assert traction.getOutputLimit(traction.left) == 1
+    assert traction.limitOutput(traction.left, -0.8) == -0.8
+
+
+def test_slip_caps_the_slipping_side(traction):
+    velocity = accelerate(traction, ACCELERATION, 10)
+    accelerate(traction, ACCELERATION, 5, spin_left=0.2, velocity=velocity)
+    assert traction.left.slipping
+    assert not traction.right.slipping
+    # capped at what the imu saw the chassis do, but never below the minimum
+    assert traction.left.acceleration_limit == pytest.approx(
+        max(ACCELERATION, traction.MIN_ACCELERATION)
+    )
+    assert traction.right.acceleration_limit == math.inf
+    assert traction.getOutputLimit(traction.left) < 1
+    # the slipping side is held near the ground speed
+    expected = traction.left.expected
+    limited = traction.limitVelocity(traction.left, expected + 2)
+    assert limited == pytest.approx(expected + traction.SLIP_VELOCITY)
+
+
+def test_slip_under_cap_holds_below_it(traction):
+    velocity = accelerate(traction, ACCELERATION, 10)
+    traction.left.acceleration_limit = 4
+    accelerate(traction, ACCELERATION, 5, spin_left=0.2, velocity=velocity)
+    held = traction.SLIP_BACKOFF * 4
+    assert traction.left.grip_limit == pytest.approx(held)
+    assert traction.left.acceleration_limit == pytest.approx(held)
+
+    # gripping again, the cap does not ramp back past where it broke loose
+    traction.reset(velocity)
+    traction.left.acceleration_limit = traction.left.grip_limit = held
+    accelerate(traction, ACCELERATION, 100, velocity=velocity)
+    assert not traction.left.slipping
+    assert traction.left.acceleration_limit == pytest.approx(held)
+
+
+def test_reset(traction):
+    velocity = accelerate(traction, ACCELERATION, 10)
+    accelerate(traction, ACCELERATION, 5, spin_left=0.2, velocity=velocity)
+    traction.reset()
+    assert not traction.isSlipping()
+    assert traction.getVelocity() == 0
+    assert traction.left.acceleration_limit == math.inf
+    assert traction.left.grip_limit == math.inf
@@ -0,0 +1,44 @@
+"""
+    Check the trapezoid profile reaches its goal within its limits, for both
+    the trapezoid and the triangle case and in both directions.
+"""
+import pytest
+
+from controls import trapezoidprofile
+
+MAX_VELOCITY = 2
+MAX_ACCELERATION = 4
+DT = 0.001
+
+
+@pytest.mark.parametrize("start, goal", [(0, 3), (1, -2), (0, 0.5), (0.5, 0)])
+def test_profile_limits(start, goal):
+    profile = trapezoidprofile.TrapezoidProfile(MAX_VELOCITY, MAX_ACCELERATION)
+    duration = profile.plan(start, goal)
+    assert profile.sample(0) == (start, 0, 0)
+    assert profile.sample(duration) == (goal, 0, 0)
+    assert profile.isFinished(duration)
+    assert not profile.isFinished(duration / 2)
+
+    prev_position, prev_velocity, _ = profile.sample(0)
+    t = DT
+    while t < duration:
+        position, velocity, acceleration = profile.sample(t)
+        assert abs(velocity) <= MAX_VELOCITY + 1e-9
+        assert abs(acceleration) <= MAX_ACCELERATION
+        # the samples are consistent with each other
+        assert position - prev_position == pytest.approx(
+            (prev_velocity + velocity) / 2 * DT, abs=1e-6
+        )
+        prev_position, prev_velocity = position, velocity
+        t += DT
+
+
+def test_profile_duration():
+    profile = trapezoidprofile.TrapezoidProfile(MAX_VELOCITY, MAX_ACCELERATION)
+    # 0.5 s up to speed and 0.5 s down covering 1 m, then 2 m at 2 m/s
+    assert profile.plan(0, 3) == pytest.approx(2)
+    # never reaches max velocity, 0.125 m up to 1 m/s and 0.125 m down
+    assert profile.plan(0, 0.25) == pytest.approx(0.5)
+    assert profile.sample(0.125) == pytest.approx((0.03125, 0.5, 4))
+    assert profile.sample(0.375) == pytest.approx((0.21875, 0.5, -4))
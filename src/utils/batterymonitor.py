@@ -0,0 +1,65 @@
+import wpilib
+
+from utils import robotconstants, telemetry, units
+
+
+class BatteryMonitor:
+    """Battery voltage sampled once per loop, raw and low-pass filtered.
+
+    The filtered voltage is what feedforward scales by, so a single noisy
+    sample or a one-loop current spike does not kick every motor output.
+    Samples below BROWNOUT_VOLTAGE are real, the roboRIO has browned out
+    and disabled the motors; isBrownedOut reports it.
+    """
+
+    NOMINAL_VOLTAGE = 12 * units.volts
+    BROWNOUT_VOLTAGE = robotconstants.PowerConstants.BROWNOUT_VOLTAGE
+    # feedforward is never scaled by less than this, the motors are off in
+    # brownout anyway and a lower divisor would only saturate the output
+    MIN_VOLTAGE = 6.3 * units.volts
+
+    # short, the voltage sags within a loop when the drive accelerates
+    TIME_CONSTANT = 0.04 * units.seconds
+    PERIOD = 20 * units.milliseconds
+
+    def __init__(self, time_constant: float = TIME_CONSTANT):
+        self.gain = self.PERIOD / (time_constant + self.PERIOD)
+        self.raw_voltage = self.NOMINAL_VOLTAGE
+        self.voltage = self.NOMINAL_VOLTAGE
+        self.initialized = False
+        self.browned_out = False
+        self.brownouts = 0
+
+    def refresh(self) -> None:
+        """Sample the battery voltage, called once per loop."""
+        self.raw_voltage = wpilib.RobotController.getBatteryVoltage()
+        if not self.initialized:
+            self.voltage = self.raw_voltage
+            self.initialized = True
+        else:
+            self.voltage += self.gain * (self.raw_voltage - self.voltage)
+
+        browned_out = (
+            wpilib.RobotController.isBrownedOut()
+            or self.raw_voltage < self.BROWNOUT_VOLTAGE
+        )
+        if browned_out and not self.browned_out:
+            self.brownouts += 1
+            telemetry.log.log("brownout", voltage=self.raw_voltage)
+        self.browned_out = browned_out
+
+    def getRawVoltage(self) -> float:
+        """This loop's battery voltage sample."""
+        return self.raw_voltage
+
+    def getVoltage(self) -> float:
+        """Filtered battery voltage, never below MIN_VOLTAGE."""
+        return max(self.voltage, self.MIN_VOLTAGE)
+
+    def isBrownedOut(self) -> bool:
+        """Whether the roboRIO was in brownout at this loop's sample."""
+        return self.browned_out
+
+    def getBrownouts(self) -> int:
+        """How many times the roboRIO has browned out since startup."""
+        return self.brownouts
@@ -0,0 +1,20 @@
+import json
+from pathlib import Path
+
+CONSTANTS_DIR = Path(__file__).resolve().parents[1] / "constants"
+
+
+def load(name: str) -> dict:
+    """Load a constants file written by a characterization routine."""
+    with open(CONSTANTS_DIR / f"{name}.json") as f:
+        return json.load(f)
+
+
+def save(name: str, values: dict) -> None:
+    """Write a constants file, replacing it atomically."""
+    path = CONSTANTS_DIR / f"{name}.json"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(values, f, indent=4, sort_keys=True)
+        f.write("\n")
+    tmp.replace(path)
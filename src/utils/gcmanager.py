@@ -0,0 +1,78 @@
+import gc
+import tracemalloc
+
+from networktables import NetworkTables
+
+
+class GCManager:
+    """Keep garbage collection out of enabled control loops.
+
+    Objects created during robot init are frozen so the collector never scans
+    them again. While enabled the collector is off, and collections only run a
+    generation at a time while disabled. With tracing on, the peak bytes
+    allocated during every loop and the blocks it left allocated are published
+    to NT.
+    """
+
+    # tracemalloc's own snapshots are not the loop's allocations
+    TRACE_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.enabled = False
+        self.generation = 0
+
+        self.loop_start = 0
+        self.loop_peak = 0
+        self.retained_blocks = 0
+        self.prev_snapshot = None
+
+        self.nt = NetworkTables.getTable("/components/gc")
+
+    def freeze(self) -> None:
+        """Move every object allocated so far into the permanent generation."""
+        gc.collect()
+        gc.freeze()
+        if self.trace:
+            tracemalloc.start()
+            self.prev_snapshot = self._takeSnapshot()
+
+    def onEnable(self) -> None:
+        self.enabled = True
+        gc.disable()
+
+    def onDisable(self) -> None:
+        self.enabled = False
+
+    def markLoopStart(self) -> None:
+        """Called at the start of every loop, before any component runs."""
+        if self.trace:
+            tracemalloc.reset_peak()
+            self.loop_start = tracemalloc.get_traced_memory()[0]
+
+    def update(self) -> None:
+        """Called once per loop, after the components."""
+        if not self.enabled:
+            # spread the work over disabled loops, one generation per loop
+            gc.collect(self.generation)
+            self.generation = (self.generation + 1) % 3
+        if self.trace:
+            self._measureLoop()
+
+    def _takeSnapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.TRACE_FILTERS)
+
+    def _measureLoop(self):
+        # read before the snapshot, which allocates
+        self.loop_peak = tracemalloc.get_traced_memory()[1] - self.loop_start
+        snapshot = self._takeSnapshot()
+        stats = snapshot.compare_to(self.prev_snapshot, "filename")
+        # blocks still allocated since the last loop, not every allocation
+        self.retained_blocks = sum(
+            stat.count_diff for stat in stats if stat.count_diff > 0
+        )
+        self.prev_snapshot = snapshot
+
+        self.nt.putNumber("loop_alloc_peak", self.loop_peak)
+        self.nt.putNumber("loop_retained_blocks", self.retained_blocks)
+        self.nt.putNumber("gc_count_0", gc.get_count()[0])
@@ -1,16 +1,137 @@
+import math
+
 import ctre
+import wpilib
 
 from utils import units
 
 
 class LazyPigeonIMU(ctre.PigeonIMU):
-    """A wrapper for the PigeonIMU."""
+    """A wrapper for the PigeonIMU that caches heading once per loop."""
+
+    TIMEOUT = 10
+
+    StatusFrame = ctre.PigeonIMU_StatusFrame
+
+    # how often the pigeon sends heading and raw gyro frames
+    STATUS_FRAME_PERIOD = 10 * units.milliseconds
+
+    # accelerometer counts per g, and the axis that points along the chassis
+    ACCELEROMETER_SCALE = 9.80665 / 16384
+    FORWARD_AXIS = 0
 
     def __init__(self, master: ctre.BaseTalon):
         super().__init__(master)
+        self.continuous_heading = 0
+        self.heading = 0
+        self.yaw_rate = 0
+        self.acceleration = 0
+        self.offset = 0
+
+        self.prev_yaw = None
+        self.prev_time = 0
+        self.calibrated = False
+
+        self.sim_rot = None
+        self.sim_position = None
+        self.sim_prev_position = None
+        self.sim_velocity = 0
+
+    def configure(self, status_frame_period: float = STATUS_FRAME_PERIOD) -> None:
+        """Set the status frame rate and apply the boot calibration, once."""
+        period = int(status_frame_period * units.to_milliseconds)
+        self.setStatusFramePeriod(
+            self.StatusFrame.PigeonIMU_CondStatus_9_SixDeg_YPR, period, self.TIMEOUT
+        )
+        self.setStatusFramePeriod(
+            self.StatusFrame.PigeonIMU_BiasedStatus_2_Gyro, period, self.TIMEOUT
+        )
+        if not self.calibrated:
+            self.setYaw(0, self.TIMEOUT)
+            self.setFusedHeading(0, self.TIMEOUT)
+            self.calibrated = True
 
     def getYaw(self) -> float:
+        """Read the yaw (degrees) from the pigeon, bypassing the cache."""
+        if wpilib.RobotBase.isSimulation():
+            return self._getSimulationRot().get()
         return self.getYawPitchRoll()[1][0]
 
+    def readHeading(self) -> float:
+        """Heading (radians) read from the pigeon, bypassing the cache.
+
+        Offset by zero() like getHeading(), but not wrapped into a range.
+        """
+        return self.getYaw() * units.degrees - self.offset
+
+    def refresh(self) -> None:
+        """Update the cached heading and yaw rate, called once per loop."""
+        now = wpilib.Timer.getFPGATimestamp()
+        yaw = self.getYaw() * units.degrees
+        if self.prev_yaw is None:
+            self.prev_yaw = yaw
+        # the pigeon is continuous, but the simulated field wraps around
+        delta = math.remainder(yaw - self.prev_yaw, 2 * math.pi)
+        self.continuous_heading += delta
+
+        if wpilib.RobotBase.isSimulation():
+            dt = now - self.prev_time
+            self.yaw_rate = delta / dt if dt > 0 else 0
+            self.acceleration = self._getSimulationAcceleration(yaw, dt)
+        else:
+            self.yaw_rate = self.getRawGyro()[1][2] * units.degrees
+            self.acceleration = (
+                self.getBiasedAccelerometer()[1][self.FORWARD_AXIS]
+                * self.ACCELEROMETER_SCALE
+            )
+        self.heading = units.angle_range(self.continuous_heading - self.offset)
+
+        self.prev_yaw = yaw
+        self.prev_time = now
+
+    def zero(self, heading: float = 0) -> None:
+        """Make the current heading read as heading (radians)."""
+        self.offset = self.continuous_heading - heading
+        self.heading = units.angle_range(heading)
+
+    def getHeading(self) -> float:
+        """Cached heading in the range [-pi, pi]."""
+        return self.heading
+
+    def getContinuousHeading(self) -> float:
+        """Cached heading that keeps counting past a full turn."""
+        return self.continuous_heading - self.offset
+
+    def getYawRate(self) -> float:
+        """Cached yaw rate in radians per second."""
+        return self.yaw_rate
+
+    def getAcceleration(self) -> float:
+        """Cached acceleration along the chassis in meters per second squared."""
+        return self.acceleration
+
     def getYawInRange(self) -> float:
-        return units.angle_range(self.getHeading())
+        return self.getHeading()
+
+    def _getSimulationRot(self):
+        if self.sim_rot is None:
+            self.sim_rot = wpilib.simulation.SimDeviceSim("Field2D").getDouble("rot")
+        return self.sim_rot
+
+    def _getSimulationAcceleration(self, heading, dt):
+        """Differentiate the simulated pose, the sim has no accelerometer."""
+        if self.sim_position is None:
+            field = wpilib.simulation.SimDeviceSim("Field2D")
+            self.sim_position = (field.getDouble("x"), field.getDouble("y"))
+        position = (self.sim_position[0].get(), self.sim_position[1].get())
+        prev = self.sim_prev_position
+        self.sim_prev_position = position
+        if prev is None or dt <= 0:
+            return 0
+        velocity = (
+            (position[0] - prev[0]) * math.cos(heading)
+            + (position[1] - prev[1]) * math.sin(heading)
+        ) / dt
+        acceleration = (velocity - self.sim_velocity) / dt
+        self.sim_velocity = velocity
+        return acceleration
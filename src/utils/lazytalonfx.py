@@ -23,25 +23,40 @@ class LazyTalonFX(ctre.WPI_TalonFX):
         self.counts_per_unit = self.CPR / (2 * np.pi)
         self.units_per_count = 2 * np.pi / self.CPR
 
+        self.supply_current_limit = None
+        self.stator_current_limit = None
+
     def setRadiansPerUnit(self, rads_per_unit):
         self.counts_per_unit = rads_per_unit * (self.CPR / (2 * np.pi))
         self.units_per_count = 1 / self.counts_per_unit
 
-    def setSupplyCurrentLimit(self, current_limit, trigger_current, trigger_time):
+    def setSupplyCurrentLimit(
+        self, current_limit, trigger_current, trigger_time, timeout=TIMEOUT
+    ):
+        """Set the supply current limit, skipping the config if it is unchanged."""
+        if self.supply_current_limit == (current_limit, trigger_current, trigger_time):
+            return
+        self.supply_current_limit = (current_limit, trigger_current, trigger_time)
         limits = ctre.SupplyCurrentLimitConfiguration(
             True, current_limit, trigger_current, trigger_time
         )
-        self.configSupplyCurrentLimit(limits, self.TIMEOUT)
-
-    def setStatorCurrentLimit(self, current_limit, trigger_current, trigger_time):
+        self.configSupplyCurrentLimit(limits, timeout)
+
+    def setStatorCurrentLimit(
+        self, current_limit, trigger_current, trigger_time, timeout=TIMEOUT
+    ):
+        """Set the stator current limit, skipping the config if it is unchanged."""
+        if self.stator_current_limit == (current_limit, trigger_current, trigger_time):
+            return
+        self.stator_current_limit = (current_limit, trigger_current, trigger_time)
         limits = ctre.StatorCurrentLimitConfiguration(
             True, current_limit, trigger_current, trigger_time
         )
-        self.configStatorCurrentLimit(limits, self.TIMEOUT)
+        self.configStatorCurrentLimit(limits, timeout)
 
     def setPIDF(self, slot: int, kp: float, ki: float, kd: float, kf: float) -> None:
         """Initialize the PIDF controller."""
-        self.selectProfileSlot(slot, self.TIMEOUT)
+        self.selectProfileSlot(slot, 0)
         self.config_kP(slot, kp, self.TIMEOUT)
         self.config_kI(slot, ki, self.TIMEOUT)
         self.config_kD(slot, kd, self.TIMEOUT)
@@ -67,7 +82,7 @@ class LazyTalonFX(ctre.WPI_TalonFX):
 
     def setOutput(self, signal: float, max_signal: float = 1) -> None:
         """Set the percent output of the motor."""
-        signal = np.clip(signal, -max_signal, max_signal)
+        signal = min(max(signal, -max_signal), max_signal)
         self.set(self.ControlMode.PercentOutput, signal)
 
     def setPosition(self, pos: float) -> None:
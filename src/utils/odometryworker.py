@@ -0,0 +1,110 @@
+import threading
+import time
+
+from controls import arcodometry
+
+
+class OdometryWorker:
+    """Run odometry on its own thread at a higher rate than the robot loop.
+
+    sample() is called every period and must return the timestamp, left and
+    right wheel positions, the gyro heading and the ground velocity, which is
+    None unless the wheels are slipping. Samples taken while slipping trust
+    the encoders only SLIP_WEIGHT and the ground velocity for the rest. The
+    latest pose is handed to
+    the main loop through a double buffer: the worker writes the back buffer,
+    then publishes it by flipping an index, so neither side ever blocks.
+
+    clock() gives the time the period is kept in, pass the robot's timer so
+    the worker follows simulated time.
+    """
+
+    RATE = 200  # Hz
+    SLIP_WEIGHT = 0.2
+
+    def __init__(self, sample, rate: float = RATE, clock=time.monotonic):
+        self.sample = sample
+        self.period = 1 / rate
+        self.clock = clock
+        self.odometry = arcodometry.ArcOdometry()
+
+        # [timestamp, x, y, heading]
+        self.buffers = ([0.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0])
+        self.front = 0
+        self.sequence = 0
+
+        self.prev_timestamp = 0
+        self.samples = 0
+        self.slip_samples = 0
+        self.overruns = 0
+        self.running = False
+        self.reset_request = None
+        self.thread = threading.Thread(target=self._run, name="odometry", daemon=True)
+
+    def start(self) -> None:
+        self.running = True
+        timestamp, left, right, gyro, _ = self.sample()
+        self.odometry.reset(0, 0, gyro, left, right, gyro)
+        self.prev_timestamp = timestamp
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and wait for it to exit."""
+        self.running = False
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def reset(self, x: float, y: float, heading: float) -> None:
+        """Reset the pose, applied by the worker on its next sample."""
+        self.reset_request = (x, y, heading)
+
+    def getPose(self):
+        """Get the latest (timestamp, x, y, heading)."""
+        while True:
+            sequence = self.sequence
+            buffer = self.buffers[self.front]
+            pose = (buffer[0], buffer[1], buffer[2], buffer[3])
+            # the worker published while we copied, the buffer may be torn
+            if self.sequence == sequence:
+                return pose
+
+    def step(self) -> None:
+        """Take one sample and publish the integrated pose."""
+        timestamp, left, right, gyro, ground_velocity = self.sample()
+        odometry = self.odometry
+        if self.reset_request is not None:
+            x, y, heading = self.reset_request
+            self.reset_request = None
+            odometry.reset(x, y, heading, left, right, gyro)
+        elif ground_velocity is None:
+            odometry.update(left, right, gyro)
+        else:
+            estimate = ground_velocity * (timestamp - self.prev_timestamp)
+            odometry.update(left, right, gyro, self.SLIP_WEIGHT, estimate)
+            self.slip_samples += 1
+        self.prev_timestamp = timestamp
+
+        back = self.buffers[1 - self.front]
+        back[0] = timestamp
+        back[1] = odometry.x
+        back[2] = odometry.y
+        back[3] = odometry.heading
+        self.front = 1 - self.front
+        self.sequence += 1
+        self.samples += 1
+
+    def _run(self):
+        clock = self.clock
+        next_time = clock()
+        while self.running:
+            self.step()
+            next_time += self.period
+            delay = next_time - clock()
+            if delay <= 0:
+                # fell behind, don't try to catch up with a burst of samples
+                self.overruns += 1
+                next_time = clock()
+            # a simulated clock can run slower than the wall, so wait on it
+            while delay > 0 and self.running:
+                time.sleep(min(delay, self.period))
+                delay = next_time - clock()
@@ -0,0 +1,80 @@
+"""Physical and tuning constants shared by the robot, simulator and benchmarks.
+
+Components and physics.py take these by inheriting the matching class. This
+module must not import the robot libraries, so the benchmarks can use it.
+"""
+import math
+
+from utils import units
+
+
+class ChassisConstants:
+    WHEEL_DIAMETER = 6 * units.inches
+    WHEEL_RADIUS = WHEEL_DIAMETER / 2
+    WHEEL_CIRCUMFERENCE = 2 * math.pi * WHEEL_RADIUS
+    GEAR_RATIO = (48 / 14) * (50 / 16)  # 10.7142861
+
+    BUMPER_WIDTH = 3.25 * units.inches
+    ROBOT_WIDTH = 30 * units.inches + BUMPER_WIDTH
+    ROBOT_LENGTH = 30 * units.inches + BUMPER_WIDTH
+    ROBOT_MASS = 100 * units.pounds
+
+    # what a percent output of 1 is taken to mean without compensation
+    NOMINAL_VOLTAGE = 12 * units.volts
+
+
+class TurretConstants:
+    KP = 1
+    KI = 0
+    KD = 0
+    KF = 0
+
+    GEAR_RATIO = 50  # motor turns per turret turn
+    MAX_VELOCITY = (
+        6380 * (2 * math.pi / units.minutes) / GEAR_RATIO
+    )  # rad / s at full output
+
+
+class TurnToAngleConstants:
+    KP = 0.25
+    TOLERANCE = 5 * units.degrees
+
+    # profiled turning
+    PROFILE_VOLTAGE = 10 * units.volts  # leave headroom for feedback
+    CRUISE_FRACTION = 0.75  # share of the voltage spent on velocity
+    PROFILE_KP = 4  # rad/s of correction per rad of tracking error
+
+
+class SimConstants:
+    TURRET_TIME_CONSTANT = 0.05  # s
+
+    # tread on carpet, past this the wheels spin
+    FRICTION_COEFFICIENT = 1.1
+
+    BATTERY_VOLTAGE = 12.5
+    BATTERY_RESISTANCE = 0.02  # ohms
+
+    # block moves into walls and field elements, see sim/fieldmap.py
+    USE_COLLISIONS = True
+    # on the initiation line, in the middle of the field, clear of obstacles
+    START_X = 10 * units.feet
+    START_Y = 26.9375 / 2 * units.feet
+
+
+class PowerConstants:
+    # the roboRIO disables every motor output below this
+    BROWNOUT_VOLTAGE = 6.8 * units.volts
+    # the power manager keeps the battery above this, clear of brownout
+    MIN_VOLTAGE = 7.5 * units.volts
+    # roboRIO, radio and everything else that is not a motor
+    BASE_CURRENT = 5
+
+    # where the battery model starts
+    MODEL_VOLTAGE = 12.5 * units.volts
+    MODEL_RESISTANCE = 0.02  # ohms
+
+    # per motor current bounds
+    CHASSIS_MIN_CURRENT = 15
+    CHASSIS_MAX_CURRENT = 60
+    TURRET_MIN_CURRENT = 5
+    TURRET_MAX_CURRENT = 40
@@ -0,0 +1,28 @@
+import numpy as np
+
+
+class SampleLog:
+    """Preallocated log of samples, one row per field.
+
+    Appending never allocates, so logging every loop does not feed the
+    garbage collector. Samples past capacity are dropped.
+    """
+
+    def __init__(self, fields, capacity: int = 15000):
+        self.fields = tuple(fields)
+        self.data = np.zeros((len(self.fields), capacity))
+        self.size = 0
+
+    def append(self, *sample) -> None:
+        if self.size < self.data.shape[1]:
+            self.data[:, self.size] = sample
+            self.size += 1
+
+    def clear(self) -> None:
+        self.size = 0
+
+    def __getitem__(self, field):
+        return self.data[self.fields.index(field), : self.size]
+
+    def save(self, path) -> None:
+        np.save(path, self.data[:, : self.size])
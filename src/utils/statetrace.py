@@ -0,0 +1,156 @@
+from array import array
+
+import wpilib
+from magicbot.state_machine import StateMachine
+from networktables import NetworkTables
+
+from utils import telemetry
+
+IDLE = "idle"
+
+
+class StateTrace:
+    """Record state transitions in a ring buffer and keep time-in-state metrics.
+
+    The metrics cover the current or last engagement, from leaving IDLE to
+    returning to it. time_to_goal stays 0 until the goal state is reached.
+
+    A flap is a return to a state that was left less than FLAP_TIME ago, such
+    as lockAtTarget -> driveToTarget -> lockAtTarget while on the edge of the
+    alignment tolerance.
+    """
+
+    CAPACITY = 256
+    FLAP_TIME = 0.5
+
+    def __init__(self, name: str, goal_state: str = None):
+        self.name = name
+        self.goal_state = goal_state
+
+        self.states = [IDLE]
+        self.state_ids = {IDLE: 0}
+
+        # ring buffer of (timestamp, state id) for every transition
+        self.times = array("d", bytes(8 * self.CAPACITY))
+        self.ids = array("H", bytes(2 * self.CAPACITY))
+        self.count = 0
+
+        self.state = IDLE
+        self.entered = 0
+        self.prev_state = IDLE
+        self.engaged = 0
+
+        self.time_in_state = {IDLE: 0}
+        self.entries = {IDLE: 0}
+        self.flaps = 0
+        self.time_to_goal = 0
+
+        self.nt = NetworkTables.getTable(f"/components/{name.lower()}/trace")
+
+    def _stateId(self, state):
+        state_id = self.state_ids.get(state)
+        if state_id is None:
+            state_id = self.state_ids[state] = len(self.states)
+            self.states.append(state)
+            self.time_in_state[state] = 0
+            self.entries[state] = 0
+        return state_id
+
+    def update(self, state: str, now: float) -> bool:
+        """Called every loop with the current state, returns True on a transition."""
+        if state == self.state:
+            return False
+        self.record(state, now)
+        return True
+
+    def record(self, state: str, now: float) -> None:
+        index = self.count % self.CAPACITY
+        self.times[index] = now
+        self.ids[index] = self._stateId(state)
+        self.count += 1
+
+        left = self.state
+        duration = now - self.entered
+        if left == IDLE:
+            # a new engagement, the metrics cover one engagement each
+            self.reset()
+            self.engaged = now
+        else:
+            self.time_in_state[left] += duration
+        self.entries[state] += 1
+
+        # first time at the goal this engagement
+        if state == self.goal_state and self.entries[state] == 1:
+            self.time_to_goal = now - self.engaged
+        # came straight back to a state it only just left
+        if (
+            state == self.prev_state
+            and left != IDLE
+            and state != IDLE
+            and duration < self.FLAP_TIME
+        ):
+            self.flaps += 1
+
+        self.prev_state = left
+        self.state = state
+        self.entered = now
+
+        telemetry.log.log(
+            "transition",
+            machine=self.name,
+            source=left,
+            target=state,
+            duration=duration,
+        )
+        self.publish()
+
+    def transitions(self):
+        """The buffered (timestamp, state) transitions, oldest first."""
+        start = max(self.count - self.CAPACITY, 0)
+        for i in range(start, self.count):
+            index = i % self.CAPACITY
+            yield self.times[index], self.states[self.ids[index]]
+
+    def reset(self) -> None:
+        """Clear the metrics, done each time the machine leaves IDLE."""
+        for state in self.time_in_state:
+            self.time_in_state[state] = 0
+            self.entries[state] = 0
+        self.flaps = 0
+        self.time_to_goal = 0
+
+    def publish(self) -> None:
+        for state, seconds in self.time_in_state.items():
+            self.nt.putNumber(f"{state}_time", seconds)
+            self.nt.putNumber(f"{state}_entries", self.entries[state])
+        self.nt.putNumber("flaps", self.flaps)
+        self.nt.putNumber("time_to_goal", self.time_to_goal)
+        self.nt.putString("state", self.state)
+
+    def export(self) -> None:
+        """Write the summary to the telemetry log."""
+        telemetry.log.log(
+            "statetrace",
+            machine=self.name,
+            time_in_state=dict(self.time_in_state),
+            entries=dict(self.entries),
+            flaps=self.flaps,
+            time_to_goal=self.time_to_goal,
+        )
+
+
+class TracedStateMachine(StateMachine):
+    """A StateMachine that traces its own transitions."""
+
+    # the state that means the machine has done its job
+    GOAL_STATE = None
+
+    trace = None
+
+    def execute(self):
+        super().execute()
+        if self.trace is None:
+            self.trace = StateTrace(type(self).__name__, self.GOAL_STATE)
+        state = (self.is_executing and self.current_state) or IDLE
+        if self.trace.update(state, wpilib.Timer.getFPGATimestamp()) and state == IDLE:
+            self.trace.export()
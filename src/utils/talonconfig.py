@@ -0,0 +1,98 @@
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ctre
+from networktables import NetworkTables
+
+
+class TalonConfig:
+    """The desired configuration of one Talon, applied as a diff.
+
+    Persistent parameters are read back from the device and only written when
+    they differ, so a Talon that kept its flash config from the last boot
+    takes no config writes at all. Parameters are in native Talon units.
+    """
+
+    TIMEOUT = 10
+
+    Param = ctre.ParamEnum
+
+    def __init__(self, inverted: bool = None, neutral_mode=None):
+        # persistent, (param, ordinal) -> value
+        self.params = {}
+        # volatile, always sent
+        self.inverted = inverted
+        self.neutral_mode = neutral_mode
+        self.profile_slot = None
+        self.status_frames = {}
+        self.voltage_compensation = None
+
+    def setPIDF(self, slot: int, kp: float, ki: float, kd: float, kf: float) -> None:
+        self.params[(self.Param.eProfileParamSlot_P, slot)] = kp
+        self.params[(self.Param.eProfileParamSlot_I, slot)] = ki
+        self.params[(self.Param.eProfileParamSlot_D, slot)] = kd
+        self.params[(self.Param.eProfileParamSlot_F, slot)] = kf
+        if self.profile_slot is None:
+            self.profile_slot = slot
+
+    def setIZone(self, slot: int, izone: int) -> None:
+        self.params[(self.Param.eProfileParamSlot_IZone, slot)] = izone
+
+    def setMotionMagic(self, cruise_velocity: int, acceleration: int) -> None:
+        self.params[(self.Param.eMotMag_VelCruise, 0)] = cruise_velocity
+        self.params[(self.Param.eMotMag_Accel, 0)] = acceleration
+
+    def setVoltageCompensation(self, volts: float) -> None:
+        """Scale percent output to a fraction of volts instead of the battery."""
+        self.params[(self.Param.eNominalBatteryVoltage, 0)] = volts
+        self.voltage_compensation = True
+
+    def setStatusFramePeriod(self, frame, period_ms: int) -> None:
+        self.status_frames[frame] = period_ms
+
+    def apply(self, talon: ctre.BaseTalon, timeout: int = TIMEOUT) -> int:
+        """Write every parameter that differs from the device, returns the write count."""
+        writes = 0
+        for (param, ordinal), value in self.params.items():
+            current = talon.configGetParameter(param, ordinal, timeout)
+            # gains are stored in fixed point on the device
+            if not math.isclose(current, value, rel_tol=1e-3, abs_tol=1e-6):
+                talon.configSetParameter(param, value, 0, ordinal, timeout)
+                writes += 1
+
+        if self.inverted is not None:
+            talon.setInverted(self.inverted)
+        if self.neutral_mode is not None:
+            talon.setNeutralMode(self.neutral_mode)
+        if self.voltage_compensation is not None:
+            talon.enableVoltageCompensation(self.voltage_compensation)
+        if self.profile_slot is not None:
+            talon.selectProfileSlot(self.profile_slot, 0)
+        for frame, period in self.status_frames.items():
+            talon.setStatusFramePeriod(frame, period, timeout)
+        return writes
+
+
+def configureAll(configs: dict, timeout: int = TalonConfig.TIMEOUT) -> dict:
+    """Apply {talon: TalonConfig} to every talon concurrently.
+
+    Returns {device id: (seconds, writes)} and publishes it to NT.
+    """
+
+    def configure(item):
+        talon, config = item
+        start = time.monotonic()
+        writes = config.apply(talon, timeout)
+        return talon.getDeviceID(), (time.monotonic() - start, writes)
+
+    with ThreadPoolExecutor(max_workers=max(len(configs), 1)) as pool:
+        results = dict(pool.map(configure, configs.items()))
+
+    nt = NetworkTables.getTable("/components/talonconfig")
+    for id, (seconds, writes) in results.items():
+        logging.info(f"Talon {id} configured in {seconds * 1000:.1f} ms, {writes} writes")
+        nt.putNumber(f"talon_{id}_time", seconds)
+        nt.putNumber(f"talon_{id}_writes", writes)
+    return results
@@ -0,0 +1,81 @@
+import collections
+import json
+import threading
+import time
+from pathlib import Path
+
+import wpilib
+
+ROBOT_DIR = Path("/home/lvuser/telemetry")
+SIM_DIR = Path("telemetry")
+
+
+class TelemetryLog:
+    """Buffered JSON lines log, flushed to disk outside the control path.
+
+    log() only queues the record. Once started, a writer thread flushes the
+    queue when requestFlush() is called, at most every FLUSH_PERIOD, so the
+    robot loop never waits on the disk. The load shedder requests flushes
+    as its lowest priority work: while the loop is short of time the
+    records stay queued and the writer does not compete with it.
+    """
+
+    FLUSH_PERIOD = 1  # s
+
+    def __init__(self, directory: Path = None):
+        if directory is None:
+            directory = SIM_DIR if wpilib.RobotBase.isSimulation() else ROBOT_DIR
+        self.path = directory / time.strftime("%Y%m%d-%H%M%S.jsonl")
+        # appends and pops are atomic, the loop and the writer need no lock
+        self.pending = collections.deque()
+        self.stopped = threading.Event()
+        self.requested = threading.Event()
+        self.thread = None
+
+    def log(self, kind: str, **fields) -> None:
+        """Queue a record, nothing is written until flush()."""
+        fields["kind"] = kind
+        fields["time"] = wpilib.Timer.getFPGATimestamp()
+        self.pending.append(fields)
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def requestFlush(self) -> None:
+        """Let the writer thread write the queue, called from the loop."""
+        self.requested.set()
+
+    def stop(self) -> None:
+        """Stop the writer thread and write whatever is still queued."""
+        self.stopped.set()
+        self.requested.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def _run(self):
+        while True:
+            self.requested.wait()
+            self.requested.clear()
+            if self.stopped.is_set():
+                return
+            self.flush()
+            if self.stopped.wait(self.FLUSH_PERIOD):
+                return
+
+    def flush(self) -> None:
+        """Write the queued records, from the writer thread once started."""
+        if not self.pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            while self.pending:
+                f.write(json.dumps(self.pending.popleft()))
+                f.write("\n")
+
+
+log = TelemetryLog()
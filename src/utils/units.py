@@ -1,13 +1,11 @@
+import math
+
 import numpy as np
 
 
 def angle_range(a: float) -> float:
     """Return an angle within the range [-pi, pi]."""
-    while a < -np.pi:
-        a += 2 * np.pi
-    while a > np.pi:
-        a -= 2 * np.pi
-    return a
+    return math.remainder(a, 2 * math.pi)
 
 
 def angle_diff(a: float, b: float) -> float:
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Build a deploy bundle of precompiled robot code.
+
+The bundle mirrors the layout of src/ but ships sourceless, optimized .pyc
+files so the roboRIO never compiles on boot. A manifest of content hashes is
+written alongside. --deploy uploads only the files that changed since the
+last deploy, whose manifest is kept as build/deployed.json, and removes the
+ones that were deleted. It also removes the .py sources and __pycache__
+entries a `robot.py deploy` left for the compiled modules, python would
+import those instead.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import py_compile
+import shlex
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+BUILD = ROOT / "build" / "bundle"
+DEPLOYED = ROOT / "build" / "deployed.json"
+
+ROBORIO_USER = "lvuser"
+ROBORIO_DIR = "/home/lvuser/py"
+
+# the roboRIO image runs this interpreter, bytecode is not portable across versions
+ROBORIO_PYTHON = (3, 9)
+
+ENTRY_POINT = "robot.py"
+PACKAGES = ("autonomous", "components", "controls", "statemachines", "utils")
+# shipped as is, loaded at runtime
+DATA = ("constants", "paths")
+# magicbot finds autonomous modes by listing .py files, so they stay as source
+SOURCE_PACKAGES = ("autonomous",)
+EXCLUDE = ("tests", "sim", "physics.py")
+
+MANIFEST = "manifest.json"
+OPTIMIZE = 2
+
+
+def sourceFiles():
+    yield SRC / ENTRY_POINT
+    for package in PACKAGES:
+        for path in sorted((SRC / package).rglob("*.py")):
+            if not any(part in EXCLUDE for part in path.relative_to(SRC).parts):
+                yield path
+
+
+def dataFiles():
+    for directory in DATA:
+        for path in sorted((SRC / directory).rglob("*")):
+            if path.is_file() and path.suffix != ".tmp":
+                yield path
+
+
+def contentHash(data: bytes) -> str:
+    # the bytecode depends on the interpreter as well as the source
+    return hashlib.sha256(importlib.util.MAGIC_NUMBER + data).hexdigest()
+
+
+def compileModule(source: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # the source is not shipped, so there is nothing to stat or hash on the robot
+    py_compile.compile(
+        str(source),
+        cfile=str(dest),
+        dfile=str(source.relative_to(SRC)),
+        doraise=True,
+        optimize=OPTIMIZE,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def loadManifest(path: Path) -> dict:
+    if path is None or not path.exists():
+        return {}
+    return json.loads(path.read_text())["files"]
+
+
+def build(out: Path = BUILD, since: Path = None) -> dict:
+    previous = loadManifest(out / MANIFEST)
+    deployed = loadManifest(since if since is not None else DEPLOYED)
+    files = {}
+    changed = []
+    for source in (*sourceFiles(), *dataFiles()):
+        rel = source.relative_to(SRC)
+        data = source.read_bytes()
+        digest = contentHash(data)
+        if (
+            rel.name == ENTRY_POINT
+            or rel.suffix != ".py"
+            or rel.parts[0] in SOURCE_PACKAGES
+        ):
+            # the entry point is run as a script, which python never caches
+            target = rel
+        else:
+            target = rel.with_suffix(".pyc")
+        files[str(target)] = digest
+
+        if previous.get(str(target)) != digest or not (out / target).exists():
+            if target == rel:
+                (out / target).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, out / target)
+            else:
+                compileModule(source, out / target)
+        if deployed.get(str(target)) != digest:
+            changed.append(str(target))
+
+    # drop modules that were deleted from the tree
+    for stale in set(previous) - set(files):
+        (out / stale).unlink(missing_ok=True)
+    removed = sorted(set(deployed) - set(files))
+
+    manifest = {
+        "python": list(sys.version_info[:2]),
+        "magic": importlib.util.MAGIC_NUMBER.hex(),
+        "files": files,
+    }
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return {"files": files, "changed": changed, "removed": removed}
+
+
+def shadowingFiles(targets):
+    """Remote globs of the files python would import instead of each .pyc."""
+    for target in targets:
+        path = Path(target)
+        if path.suffix == ".pyc":
+            # a source next to the .pyc wins, and brings its cached bytecode
+            yield shlex.quote(str(path.with_suffix(".py")))
+            yield shlex.quote(str(path.parent / "__pycache__" / path.stem)) + ".*.pyc"
+
+
+def deploy(result: dict, team: int, out: Path = BUILD) -> None:
+    """Upload the changed files of a build to the roboRIO and remove deleted ones."""
+    host = f"{ROBORIO_USER}@roborio-{team}-frc.local"
+    removed = " ".join(
+        (
+            *(shlex.quote(path) for path in result["removed"]),
+            *shadowingFiles((*result["files"], *result["removed"])),
+        )
+    )
+    subprocess.run(
+        ["ssh", host, f"mkdir -p {ROBORIO_DIR} && cd {ROBORIO_DIR} && rm -f {removed}"],
+        check=True,
+    )
+    # one connection for every changed file
+    archive = subprocess.run(
+        ["tar", "-C", str(out), "-cf", "-", MANIFEST, *result["changed"]],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    subprocess.run(
+        ["ssh", host, f"tar -C {ROBORIO_DIR} -xf -"], input=archive, check=True
+    )
+    # the next deploy only sends what changed since this one
+    shutil.copyfile(out / MANIFEST, DEPLOYED)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, default=BUILD)
+    parser.add_argument(
+        "--since", type=Path, help="manifest of the last deploy to diff against"
+    )
+    parser.add_argument(
+        "--deploy", type=int, metavar="TEAM", help="upload the changes to a roboRIO"
+    )
+    args = parser.parse_args()
+
+    if sys.version_info[:2] != ROBORIO_PYTHON:
+        print(
+            f"warning: building with python {sys.version_info[0]}.{sys.version_info[1]},"
+            f" the roboRIO runs {ROBORIO_PYTHON[0]}.{ROBORIO_PYTHON[1]}",
+            file=sys.stderr,
+        )
+
+    result = build(args.out, args.since)
+    print(f"{len(result['files'])} modules in {args.out}")
+    for path in result["changed"]:
+        print(f"  changed: {path}")
+    for path in result["removed"]:
+        print(f"  removed: {path}")
+    if args.deploy is not None:
+        deploy(result, args.deploy, args.out)
+        print(
+            f"deployed {len(result['changed'])} changed,"
+            f" {len(result['removed'])} removed"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compare cold-start module loading of the source tree against the deploy bundle.
+
+Each trial runs in a fresh interpreter. The source layout reads and compiles
+every module, as a roboRIO does on first boot with an empty __pycache__. The
+bundle layout reads and unmarshals the precompiled bytecode. With --import
+the robot package is also imported for real from each layout, which needs the
+robot dependencies installed.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import bundle
+
+LOAD_SOURCE = """
+import sys, time
+from pathlib import Path
+start = time.perf_counter()
+for path in sys.argv[1:]:
+    compile(Path(path).read_bytes(), path, "exec", optimize=2)
+print(time.perf_counter() - start)
+"""
+
+LOAD_BUNDLE = """
+import marshal, sys, time
+from pathlib import Path
+start = time.perf_counter()
+for path in sys.argv[1:]:
+    data = Path(path).read_bytes()
+    marshal.loads(memoryview(data)[16:])
+print(time.perf_counter() - start)
+"""
+
+IMPORT_ROBOT = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import robot
+print(time.perf_counter() - start)
+"""
+
+
+def run(script, args, trials):
+    times = []
+    for _ in range(trials):
+        out = subprocess.run(
+            [sys.executable, "-B", "-c", script, *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def report(name, times):
+    print(
+        f"{name:>8}: median {statistics.median(times) * 1000:7.2f} ms"
+        f"  min {min(times) * 1000:7.2f} ms  ({len(times)} runs)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--import", dest="full_import", action="store_true")
+    args = parser.parse_args()
+
+    result = bundle.build()
+    sources = [str(path) for path in bundle.sourceFiles()]
+    compiled = [
+        str(bundle.BUILD / path) for path in result["files"] if path.endswith(".pyc")
+    ]
+    modules = [path for path in sources if not path.endswith(bundle.ENTRY_POINT)]
+
+    report("source", run(LOAD_SOURCE, modules, args.trials))
+    report("bundle", run(LOAD_BUNDLE, compiled, args.trials))
+    if args.full_import:
+        report("import", run(IMPORT_ROBOT, [str(bundle.SRC)], args.trials))
+        report("import", run(IMPORT_ROBOT, [str(bundle.BUILD)], args.trials))
+
+
+if __name__ == "__main__":
+    main()
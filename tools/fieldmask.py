@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Draw the binary field mask the simulator checks collisions against.
+
+Free carpet is white and walls and field elements are black. Only what a
+robot can run into at bumper height is drawn: the perimeter and the four
+shield generator columns. The trenches are left open, robots drive under
+them. Element positions are approximate, taken from the game manual
+drawings.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from sim import fieldmap  # noqa: E402
+from utils import units  # noqa: E402
+
+RESOLUTION = 2 * units.inches  # per pixel
+
+WALL_THICKNESS = 2 * units.inches
+
+# shield generator columns, around the field center
+GENERATOR_ANGLE = 22.5 * units.degrees
+GENERATOR_LENGTH = 14.5 * units.feet  # between column centers, along the field
+GENERATOR_WIDTH = 10.5 * units.feet
+COLUMN_SIZE = 1 * units.feet
+
+
+def drawMask(
+    length=fieldmap.FieldMap.FIELD_LENGTH, width=fieldmap.FieldMap.FIELD_WIDTH
+):
+    cols = round(length / RESOLUTION)
+    rows = round(width / RESOLUTION)
+    # cell centers in field coordinates, y up and row 0 at the far wall
+    x = (np.arange(cols) + 0.5) * (length / cols)
+    y = width - (np.arange(rows) + 0.5) * (width / rows)
+    x, y = np.meshgrid(x, y)
+
+    occupied = (
+        (x < WALL_THICKNESS)
+        | (x > length - WALL_THICKNESS)
+        | (y < WALL_THICKNESS)
+        | (y > width - WALL_THICKNESS)
+    )
+
+    cos = np.cos(GENERATOR_ANGLE)
+    sin = np.sin(GENERATOR_ANGLE)
+    for sx in (-1, 1):
+        for sy in (-1, 1):
+            # column center, rotated with the generator
+            cx = sx * GENERATOR_LENGTH / 2
+            cy = sy * GENERATOR_WIDTH / 2
+            column_x = length / 2 + cx * cos - cy * sin
+            column_y = width / 2 + cx * sin + cy * cos
+            # cell in the column frame
+            dx = x - column_x
+            dy = y - column_y
+            along = dx * cos + dy * sin
+            across = -dx * sin + dy * cos
+            occupied |= (np.abs(along) <= COLUMN_SIZE / 2) & (
+                np.abs(across) <= COLUMN_SIZE / 2
+            )
+
+    return np.where(occupied, 0, 255).astype(np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, default=fieldmap.FIELD_IMAGE)
+    args = parser.parse_args()
+
+    mask = drawMask()
+    args.out.write_bytes(fieldmap.encodePNG(mask))
+    print(
+        f"wrote {args.out} ({mask.shape[1]}x{mask.shape[0]},"
+        f" {np.mean(mask == 0):.1%} occupied)"
+    )
+
+
+if __name__ == "__main__":
+    main()